@@ -5,6 +5,7 @@ from app.extensions import db, migrate, login, cache, scheduler
 from flask_admin import Admin
 from flask_wtf.csrf import CSRFProtect
 import atexit
+import logging
 
 csrf = CSRFProtect()
 
@@ -12,6 +13,8 @@ csrf = CSRFProtect()
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # Ingest run summaries go through the app logger's handler at INFO.
+    app.logger.getChild('metrics').setLevel(logging.INFO)
 
     db.init_app(app)
     migrate.init_app(app, db)
@@ -28,25 +31,45 @@ def create_app(config_class=Config):
     from app.auth import bp as auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
 
+    from app.api import bp as api_bp
+    app.register_blueprint(api_bp, url_prefix='/api')
+
     from app.admin import init_admin
     init_admin(admin)
 
-    from app.bill_tracker import update_bills_from_rss, update_bill_categories
+    from app.bill_tracker import update_bills, update_bill_categories
+    from app.locks import single_flight
 
-    def run_bill_update():
+    def run_exclusive(lock_name, func):
         with app.app_context():
-            update_bills_from_rss()
+            with single_flight(lock_name) as acquired:
+                if not acquired:
+                    app.logger.info(
+                        f"Skipping scheduled {lock_name}; already running elsewhere")
+                    return
+                func()
+
+    def run_bill_update():
+        run_exclusive('bill-ingest', update_bills)
 
     def run_category_update():
-        with app.app_context():
-            update_bill_categories()
+        run_exclusive('recategorize', update_bill_categories)
 
-    scheduler.add_job(func=run_bill_update, trigger="interval", hours=6)
-    scheduler.add_job(func=run_category_update, trigger="interval", hours=24)
-    scheduler.start()
-    atexit.register(lambda: scheduler.shutdown())
+    # Opt-in so WSGI workers and CLI invocations don't each start a copy.
+    if app.config['SCHEDULER_ENABLED']:
+        scheduler.add_job(func=run_bill_update, trigger="interval", hours=6,
+                          max_instances=1, coalesce=True)
+        scheduler.add_job(func=run_category_update, trigger="interval",
+                          hours=24, max_instances=1, coalesce=True)
+        scheduler.start()
+        atexit.register(lambda: scheduler.shutdown())
 
-    from app.cli import create_superuser
+    from app.cli import create_superuser, rebuild_search_index_command, \
+        recategorize, export_bills, backfill_command
     app.cli.add_command(create_superuser)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(recategorize)
+    app.cli.add_command(export_bills)
+    app.cli.add_command(backfill_command)
 
     return app
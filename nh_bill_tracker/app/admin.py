@@ -1,10 +1,11 @@
 from flask_admin import Admin, BaseView, expose
 from flask_admin.contrib.sqla import ModelView
 from flask_login import current_user, login_required
-from flask import redirect, url_for, flash, Markup, current_app, render_template
+from flask import redirect, url_for, flash, Markup, current_app, render_template, jsonify
 from app.extensions import db
 from app.models import User, Bill
-from app.bill_tracker import update_bills
+from app.caching import bump_data_generation
+from app.jobs import current_job, get_job, start_ingest_job
 from flask_wtf import FlaskForm
 import logging
 
@@ -18,14 +19,20 @@ class SuperuserModelView(ModelView):
 
 
 class BillModelView(SuperuserModelView):
-    column_list = ('number', 'summary', 'sponsor',
-                   'last_updated', 'status', 'html_link')
+    column_list = ('number', 'summary', 'sponsor', 'last_updated',
+                   'house_status', 'senate_status', 'html_link')
     column_searchable_list = ('number', 'summary', 'sponsor', 'full_text')
-    column_filters = ('last_updated', 'status')
+    column_filters = ('last_updated', 'house_status', 'senate_status')
     column_formatters = {
         'html_link': lambda v, c, m, p: Markup(f'<a href="{m.html_link}" target="_blank">View Bill</a>')
     }
 
+    def after_model_change(self, form, model, is_created):
+        bump_data_generation()
+
+    def after_model_delete(self, model):
+        bump_data_generation()
+
 
 class UpdateBillsForm(FlaskForm):
     pass  # We don't need any fields, just CSRF protection
@@ -43,7 +50,8 @@ class UpdateBillsView(BaseView):
             flash('You must be a superuser to access this page.', 'error')
             return redirect(url_for('admin.index'))
         form = UpdateBillsForm()
-        return self.render('admin/update_bills.html', form=form)
+        return self.render('admin/update_bills.html', form=form,
+                           job=current_job())
 
     @expose('/update', methods=['POST'])
     @login_required
@@ -57,15 +65,37 @@ class UpdateBillsView(BaseView):
                     f"Non-superuser {current_user.username} attempted to update bills")
                 flash('You must be a superuser to update bills.', 'error')
                 return redirect(url_for('admin.index'))
-            new_bills, updated_bills = update_bills()
-            flash(
-                f'Added {new_bills} new bills and updated {updated_bills} bills.', 'success')
+            job_id, started = start_ingest_job(current_app._get_current_object())
+            if started:
+                flash('Bill update started.', 'success')
+            else:
+                flash('A bill update is already running; showing its progress.',
+                      'success')
+            return redirect(url_for('.job', job_id=job_id))
         else:
             flash('CSRF token is missing or invalid', 'error')
         return redirect(url_for('admin.index'))
 
+    @expose('/job/<job_id>')
+    @login_required
+    def job(self, job_id):
+        if not current_user.is_superuser:
+            flash('You must be a superuser to access this page.', 'error')
+            return redirect(url_for('admin.index'))
+        return self.render('admin/update_bills_progress.html', job_id=job_id)
+
+    @expose('/job/<job_id>/progress')
+    @login_required
+    def job_progress(self, job_id):
+        if not current_user.is_superuser:
+            return jsonify(error='forbidden'), 403
+        job = get_job(job_id)
+        if job is None:
+            return jsonify(error='unknown job'), 404
+        return jsonify(job)
+
 
 def init_admin(admin):
-    admin.add_view(ModelView(Bill, db.session))
+    admin.add_view(BillModelView(Bill, db.session))
     admin.add_view(UpdateBillsView(
         name='Update Bills', endpoint='update_bills'))
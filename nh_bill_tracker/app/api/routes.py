@@ -0,0 +1,108 @@
+import json
+from datetime import datetime
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy.orm import undefer
+from app.api import bp
+from app.caching import cached_page
+from app.extensions import db
+from app.models import Bill
+from app.pagination import KeysetPage, iter_keyset_rows, BILL_RECENCY_KEYS
+
+API_FIELDS = ('number', 'session_year', 'title', 'summary', 'sponsor',
+              'category', 'general_status', 'house_status', 'senate_status',
+              'html_link', 'docket_link', 'last_updated')
+
+
+def serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def bill_to_dict(row, fields=API_FIELDS):
+    return {field: serialize(getattr(row, field)) for field in fields}
+
+
+def api_error(message, status=400):
+    response = jsonify(error=message)
+    response.status_code = status
+    return response
+
+
+def filtered_bill_rows(fields):
+    """Column query over ``fields`` with the shared listing filters applied.
+
+    Raises ValueError for a malformed ``updated_since``.
+    """
+    query = db.session.query(Bill.id, *[getattr(Bill, f) for f in fields])
+    category = request.args.get('category')
+    session_year = request.args.get('session_year')
+    updated_since = request.args.get('updated_since')
+    if category:
+        query = query.filter(Bill.category == category)
+    if session_year:
+        query = query.filter(Bill.session_year == session_year)
+    if updated_since:
+        query = query.filter(
+            Bill.last_updated >= datetime.fromisoformat(updated_since))
+    return query
+
+
+@bp.route('/bills')
+@cached_page
+def list_bills():
+    try:
+        query = filtered_bill_rows(API_FIELDS)
+    except ValueError:
+        return api_error('updated_since must be an ISO 8601 timestamp')
+    per_page = min(request.args.get('limit', 50, type=int),
+                   current_app.config['API_MAX_PAGE_SIZE'])
+    page = KeysetPage(query, BILL_RECENCY_KEYS,
+                      cursor=request.args.get('cursor'),
+                      per_page=max(per_page, 1))
+    return jsonify(bills=[bill_to_dict(row) for row in page.items],
+                   next_cursor=page.next_cursor,
+                   prev_cursor=page.prev_cursor)
+
+
+@bp.route('/bills/<bill_number>')
+@cached_page
+def get_bill(bill_number):
+    query = Bill.query.options(undefer(Bill.category_scores))
+    include_text = request.args.get('include') == 'full_text'
+    if include_text:
+        query = query.options(undefer(Bill.full_text))
+    bill = Bill.by_number(bill_number, request.args.get('session_year'),
+                          query).first()
+    if bill is None:
+        return api_error(f'Bill {bill_number} not found', 404)
+    data = bill_to_dict(bill)
+    data['category_scores'] = bill.category_scores
+    if include_text:
+        data['full_text'] = bill.full_text
+    return jsonify(data)
+
+
+@bp.route('/bills/stream')
+def stream_bills():
+    """NDJSON dump in (last_updated, id) order for incremental syncs.
+
+    Rows are read in API_STREAM_CHUNK_SIZE keyset chunks, so the table is
+    never held in memory. Pass the last ``last_updated`` seen as
+    ``updated_since`` to pull only what changed; ingest stamps it in UTC
+    as each batch is written.
+    """
+    fields = API_FIELDS
+    if request.args.get('include') == 'full_text':
+        fields = API_FIELDS + ('full_text',)
+    try:
+        query = filtered_bill_rows(fields)
+    except ValueError:
+        return api_error('updated_since must be an ISO 8601 timestamp')
+    chunk_size = current_app.config['API_STREAM_CHUNK_SIZE']
+
+    def generate():
+        for row in iter_keyset_rows(query, BILL_RECENCY_KEYS, chunk_size):
+            yield json.dumps(bill_to_dict(row, fields)) + '\n'
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/x-ndjson')
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+
+from flask import current_app
+
+from app.bill_tracker import (BudgetExhausted, FeedError,
+                              changed_feed_entries, iter_feed_entries,
+                              process_bill, run_pipeline, session_feed_url,
+                              write_bills)
+from app.extensions import db
+from app.ingest_loop import ingest_loop
+from app.metrics import ingest_metrics
+from app.models import BackfillCheckpoint
+from app.parsing import create_parse_executor
+from app.text_cache import open_text_cache
+
+
+def parse_sessions(spec):
+    """Expand '2016-2025' or '2016,2019-2021' into sorted session years."""
+    years = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise ValueError(f'Invalid session range: {part}')
+        start, end = int(start), int(end or start)
+        if end < start:
+            raise ValueError(f'Invalid session range: {part}')
+        years.update(range(start, end + 1))
+    return [str(year) for year in sorted(years)]
+
+
+class RequestBudget:
+    """Concurrency cap and optional request allowance shared by all sessions.
+
+    The allowance is charged by fetch_with_retry for every HTTP attempt,
+    retries included.
+    """
+
+    def __init__(self, max_concurrency, max_requests=None):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.remaining = max_requests
+
+    def take(self):
+        if self.remaining is None:
+            return True
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    @property
+    def exhausted(self):
+        return self.remaining is not None and self.remaining <= 0
+
+
+def get_checkpoint(session_year):
+    checkpoint = BackfillCheckpoint.query.filter_by(
+        session_year=session_year).first()
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(session_year=session_year, status='pending',
+                                        total=0, completed=0, failed=0)
+        db.session.add(checkpoint)
+        db.session.commit()
+    return checkpoint
+
+
+async def backfill_session(session, session_year, budget, text_cache, executor,
+                           refresh=False, report=None):
+    config = current_app.config
+    checkpoint = get_checkpoint(session_year)
+    if checkpoint.status == 'complete' and not refresh:
+        return checkpoint
+    if budget.exhausted:
+        return checkpoint
+
+    checkpoint.status = 'running'
+    checkpoint.total = 0
+    checkpoint.completed = 0
+    checkpoint.failed = 0
+    db.session.commit()
+
+    def count_entries(changed, unchanged):
+        checkpoint.total += changed + unchanged
+        checkpoint.completed += unchanged
+
+    # Bills whose fingerprint is already committed were finished by an
+    # earlier run, which is what makes an interrupted backfill resumable.
+    fingerprints = {}
+    feed_url = session_feed_url(config['RSS_FEED_URL'], session_year)
+    pending = changed_feed_entries(iter_feed_entries(session, feed_url,
+                                                     budget=budget),
+                                   session_year, fingerprints, count_entries)
+
+    async def fetch_bill(entry):
+        # Bills reached after the allowance ran out are left for next run.
+        if budget.exhausted:
+            return None
+        async with budget.semaphore:
+            try:
+                return await process_bill(
+                    session, entry, text_cache, executor,
+                    config['BILL_TEXT_BASE_URL'], session_year=session_year,
+                    docket_base_url=config['BILL_DOCKET_BASE_URL'],
+                    budget=budget, new=entry.title not in fingerprints)
+            except BudgetExhausted:
+                # Refused partway through; neither written nor failed.
+                return None
+
+    batch_size = config['INGEST_WRITE_BATCH_SIZE']
+
+    def write(results):
+        bills_data = [result for result in results if result is not None]
+        if not bills_data:
+            return
+        done = sum(1 for result in bills_data
+                   if isinstance(result, dict) and result['fingerprint'])
+        # Counted before write_bills so the checkpoint commits with the bills.
+        checkpoint.completed += done
+        checkpoint.failed += len(bills_data) - done
+        write_bills(bills_data, fingerprints.keys(), batch_size)
+        if report:
+            report(checkpoint)
+
+    # The shared budget semaphore is what bounds requests across sessions.
+    try:
+        await run_pipeline(pending, fetch_bill, write,
+                           config['INGEST_MAX_CONCURRENCY'], batch_size)
+    except FeedError as e:
+        logging.error(f"{e}; the {session_year} backfill will resume next run")
+        checkpoint.status = 'partial'
+    else:
+        checkpoint.status = 'complete' \
+            if checkpoint.completed >= checkpoint.total else 'partial'
+    db.session.commit()
+    return checkpoint
+
+
+async def backfill_sessions(session_years, max_requests=None, refresh=False,
+                            report=None):
+    config = current_app.config
+    budget = RequestBudget(config['INGEST_MAX_CONCURRENCY'], max_requests)
+    session_slots = asyncio.Semaphore(config['BACKFILL_PARALLEL_SESSIONS'])
+    text_cache = open_text_cache(config)
+    executor = create_parse_executor(config)
+    session = await ingest_loop.session(config)
+
+    async def run(session_year):
+        async with session_slots:
+            return await backfill_session(
+                session, session_year, budget, text_cache, executor,
+                refresh, report)
+
+    metrics_run = ingest_metrics.start_run('backfill')
+    status = 'failed'
+    try:
+        checkpoints = await asyncio.gather(*(run(year) for year in session_years))
+        status = 'complete' if all(checkpoint.status == 'complete'
+                                   for checkpoint in checkpoints) else 'partial'
+        return checkpoints
+    finally:
+        executor.shutdown()
+        text_cache.close()
+        ingest_metrics.finish_run(metrics_run, status,
+                                  sessions=len(session_years))
+
+
+def backfill(session_years, max_requests=None, refresh=False, report=None):
+    # Runs on the ingest loop under its own app context, so the returned
+    # checkpoints are detached; re-query them to read their state.
+    return ingest_loop.run(current_app._get_current_object(), backfill_sessions,
+                           session_years, max_requests, refresh, report)
@@ -1,137 +1,757 @@
 import asyncio
 import aiohttp
-import feedparser
-from bs4 import BeautifulSoup
-from datetime import datetime
-from app.extensions import db, cache
-from app.models import Bill
+from datetime import date, datetime
+from flask import current_app
+from app.extensions import db
+from app.caching import bump_data_generation
+from app.models import Bill, DocketEntry, Hearing
+from app.text_cache import content_hash, open_text_cache
+from app.ratelimit import backoff_delay, host_policies, retry_after_seconds
+from app.ingest_loop import ingest_loop
+from app.categorizer import categorizer
+from app.metrics import ingest_metrics
+from app.parsing import FeedItemParser, classify_text, create_parse_executor, \
+    parse_and_classify, parse_docket, parse_hearing, strip_tags, timed_call
+from collections import namedtuple
+import hashlib
 import re
 import logging
+import time
+import xml.etree.ElementTree as ElementTree
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-RSS_FEED_URL = "https://www.gencourt.state.nh.us/rssFeeds/rssQueryResults.aspx?&txtsessionyear=2024&sortoption="
 BASE_URL = "https://www.gencourt.state.nh.us/bill_status/legacy/bs2016/billText.aspx"
+DOCKET_BASE_URL = "https://www.gencourt.state.nh.us/bill_status/legacy/bs2016/bill_docket.aspx"
+FETCH_FAILED_TEXT = "Failed to fetch full bill text"
+# Stay under SQLite's default limit on bound parameters per statement.
+LOOKUP_CHUNK_SIZE = 500
 
 
-async def fetch_with_retry(session, url, max_retries=3):
+FetchResult = namedtuple(
+    'FetchResult', ['status', 'body', 'encoding', 'etag', 'last_modified'])
+BillText = namedtuple(
+    'BillText', ['text', 'changed', 'fetched', 'category', 'scores'])
+
+THROTTLE_STATUSES = (429, 503)
+REQUEST_TIMEOUT = 30
+# The feed download pauses whenever bill processing falls behind, so it has
+# no overall limit; only a host that stops sending times out. aiohttp stops
+# the read timer while reading is paused.
+FEED_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=REQUEST_TIMEOUT,
+                                     sock_read=REQUEST_TIMEOUT)
+FEED_CHUNK_SIZE = 64 * 1024
+# Parsed entries held ahead of the pipeline; a full queue stops reading the
+# feed, so memory doesn't grow with the size of the feed.
+FEED_QUEUE_SIZE = 2 * LOOKUP_CHUNK_SIZE
+
+
+class FeedError(Exception):
+    pass
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+class ThrottledError(Exception):
+    def __init__(self, status, retry_after):
+        super().__init__(f"HTTP {status}, retry after {retry_after}s")
+        self.status = status
+        self.retry_after = retry_after
+
+
+async def fetch_with_retry(session, url, max_retries=3, headers=None,
+                           read=None, timeout=REQUEST_TIMEOUT, budget=None):
+    """GET ``url`` through the host's rate limiter and circuit breaker.
+
+    Returns a FetchResult, or whatever ``read(response)`` returns when
+    given one to consume the body. Returns None once retries are exhausted,
+    on a client error, or straight away while the host's circuit is open.
+    Raises BudgetExhausted once ``budget`` (charged per attempt) runs out.
+    """
+    policy = host_policies.for_url(url)
     for attempt in range(max_retries):
+        if budget is not None and not budget.take():
+            raise BudgetExhausted(url)
+        if not policy.breaker.allow():
+            logging.info(f"Circuit open; skipping {url}")
+            return None
+        with ingest_metrics.timer('rate_limit_wait'):
+            await policy.bucket.acquire()
+        retry_after = None
+        responded = False
+        recorded = False
+        started = time.monotonic()
         try:
-            async with session.get(url, timeout=30) as response:
-                response.raise_for_status()
-                return await response.text()
+            async with session.get(url, timeout=timeout, headers=headers) as response:
+                # Time to headers, so long or streamed bodies don't read as
+                # a slow host.
+                latency = time.monotonic() - started
+                responded = True
+                ingest_metrics.observe_latency(latency)
+                ingest_metrics.inc('nh_ingest_http_requests_total',
+                                   status=str(response.status))
+                if response.status in THROTTLE_STATUSES:
+                    retry_after = retry_after_seconds(
+                        response.headers.get('Retry-After'))
+                    # A bare 503 is an ordinary failure; with Retry-After
+                    # (or a 429) the host is asking us to slow down.
+                    if response.status == 429 or retry_after is not None:
+                        policy.bucket.throttle(retry_after)
+                    raise ThrottledError(response.status, retry_after)
+                if response.status == 304:
+                    result = FetchResult(304, None, None,
+                                         response.headers.get('ETag'),
+                                         response.headers.get('Last-Modified'))
+                elif read is not None:
+                    response.raise_for_status()
+                    result = await read(response)
+                else:
+                    response.raise_for_status()
+                    body = await response.read()
+                    ingest_metrics.inc('nh_ingest_http_response_bytes_total',
+                                       len(body))
+                    result = FetchResult(response.status, body,
+                                         response.get_encoding(),
+                                         response.headers.get('ETag'),
+                                         response.headers.get('Last-Modified'))
+            policy.bucket.record_latency(latency)
+            policy.breaker.record_success()
+            recorded = True
+            return result
+        except FeedError:
+            # The host answered; the content is what's broken, and it will
+            # be broken again on a retry.
+            policy.breaker.record_success()
+            recorded = True
+            raise
         except Exception as e:
+            if not responded:
+                ingest_metrics.inc('nh_ingest_http_requests_total',
+                                   status='error')
+            status = getattr(e, 'status', None)
+            # A 429 means the host is up but wants us slower, and other 4xx
+            # answers won't change on retry; either way the host answered.
+            client_error = status is not None and 400 <= status < 500
+            if client_error:
+                policy.breaker.record_success()
+            else:
+                policy.breaker.record_failure()
+            recorded = True
             logging.warning(
                 f"Attempt {attempt + 1} failed for URL {url}: {str(e)}")
+            if client_error and status != 429:
+                return None
             if attempt == max_retries - 1:
                 logging.error(
                     f"Failed to fetch {url} after {max_retries} attempts")
                 return None
-            await asyncio.sleep(1 * (2 ** attempt))  # Exponential backoff
-
-
-async def fetch_full_bill_text(session, url):
-    content = await fetch_with_retry(session, url)
-    if content:
-        soup = BeautifulSoup(content, 'html.parser')
-        bill_text_elem = soup.find('pre', class_='aaaCtype')
-        return bill_text_elem.text if bill_text_elem else "Full bill text not available"
-    return "Failed to fetch full bill text"
-
-
-def categorize_bill(bill_text):
-    categories = {
-        'Education': ['education', 'school', 'student', 'teacher', 'university', 'college'],
-        'Health': ['health', 'medical', 'hospital', 'doctor', 'patient', 'healthcare'],
-        'Transportation': ['transport', 'road', 'highway', 'vehicle', 'traffic', 'transit'],
-        'Environment': ['environment', 'climate', 'pollution', 'energy', 'conservation'],
-        'Economy': ['economy', 'tax', 'budget', 'finance', 'business', 'employment'],
-        'Public Safety': ['police', 'crime', 'prison', 'fire', 'emergency', 'safety'],
-        'Housing': ['housing', 'rent', 'property', 'zoning', 'development'],
-    }
+            ingest_metrics.inc('nh_ingest_http_retries_total')
+            await asyncio.sleep(retry_after if retry_after is not None else
+                                backoff_delay(attempt, policy.backoff_base,
+                                              policy.backoff_max))
+        finally:
+            if not recorded:
+                # Cancelled mid-request; don't hold the half-open probe.
+                policy.breaker.release()
 
-    bill_text = bill_text.lower()
-    for category, keywords in categories.items():
-        if any(keyword in bill_text for keyword in keywords):
-            return category
-    return 'Other'  # Default category if no match is found
 
+async def iter_feed_entries(session, url, max_retries=3, budget=None):
+    """Yield the feed's items as they are parsed off the wire.
 
-async def process_bill(session, entry):
-    bill_number = entry.title
-    bill_url = entry.link
-    bill_id = extract_bill_id(bill_url)
-    session_year = entry.get('sessionyear', '2024')
-    html_link = get_bill_html_link(session_year, bill_id)
+    Raises FeedError if the feed can't be read to the end. A retry after a
+    dropped connection skips the items already yielded.
+    """
+    entries = asyncio.Queue(maxsize=FEED_QUEUE_SIZE)
+    finished = object()
+    emitted = 0
+
+    async def read(response):
+        nonlocal emitted
+        parser = FeedItemParser()
+        seen = 0
+
+        async def emit(items):
+            nonlocal emitted, seen
+            for item in items:
+                seen += 1
+                if seen > emitted:
+                    emitted += 1
+                    await entries.put(item)
+
+        try:
+            async for chunk in response.content.iter_chunked(FEED_CHUNK_SIZE):
+                ingest_metrics.inc('nh_ingest_http_response_bytes_total',
+                                   len(chunk))
+                with ingest_metrics.timer('feed_parse'):
+                    items = parser.feed(chunk)
+                await emit(items)
+            with ingest_metrics.timer('feed_parse'):
+                items = parser.close()
+        except ElementTree.ParseError as e:
+            # Keep every item that parsed before the error.
+            await emit(parser.read_items())
+            raise FeedError(f"Malformed feed at {url}: {e}") from e
+        await emit(items)
+        return True
+
+    async def produce():
+        # Wall time of the whole download, which overlaps bill processing.
+        with ingest_metrics.timer('feed_fetch'):
+            try:
+                completed = await fetch_with_retry(
+                    session, url, max_retries, read=read,
+                    timeout=FEED_TIMEOUT, budget=budget)
+                error = None if completed else \
+                    FeedError(f"Could not read the feed at {url}")
+            except BudgetExhausted:
+                error = FeedError(
+                    f"Request budget ran out reading the feed at {url}")
+            except FeedError as e:
+                error = e
+        await entries.put(error or finished)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            entry = await entries.get()
+            if entry is finished:
+                return
+            if isinstance(entry, FeedError):
+                raise entry
+            yield entry
+    finally:
+        producer.cancel()
+
+
+async def fetch_full_bill_text(session, url, text_cache=None, executor=None,
+                               progress=None, budget=None):
+    """Return a BillText for the bill text page at ``url``.
+
+    ``changed`` is False when the cached copy is still current, either
+    because the server answered 304 or the body hashes to the same value.
+    ``fetched`` is False when the page couldn't be fetched, in which case
+    the text is the cached copy or None and ``changed`` is False. Changed
+    texts come back categorized.
+    """
+    cached = text_cache.get(url) if text_cache else None
+    headers = {}
+    if cached:
+        if cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
 
-    full_text = await fetch_full_bill_text(session, html_link)
-    category = categorize_bill(full_text)
+    result = await fetch_with_retry(session, url, headers=headers,
+                                    budget=budget)
+    if progress and result:
+        progress.advance('fetched')
+    if result is None:
+        return BillText(cached.text if cached else None, False, False,
+                        None, None)
+    if result.status == 304 and cached:
+        return BillText(cached.text, False, True, None, None)
 
+    body_hash = content_hash(result.body)
+    if cached and cached.content_hash == body_hash:
+        text_cache.put(url, result.etag, result.last_modified,
+                       body_hash, cached.text)
+        return BillText(cached.text, False, True, None, None)
+
+    loop = asyncio.get_running_loop()
+    full_text, category, scores, parse_seconds, classify_seconds = \
+        await loop.run_in_executor(executor, parse_and_classify,
+                                   result.body, result.encoding)
+    ingest_metrics.add_time('html_parse', parse_seconds)
+    ingest_metrics.add_time('categorize', classify_seconds)
+    if text_cache:
+        text_cache.put(url, result.etag, result.last_modified,
+                       body_hash, full_text)
+    return BillText(full_text, True, True, category, scores)
+
+
+async def fetch_docket(session, url, executor=None, budget=None):
+    """Return the bill's docket as ``(date, chamber, action)`` tuples."""
+    result = await fetch_with_retry(session, url, budget=budget)
+    if result is None:
+        return None
+    loop = asyncio.get_running_loop()
+    docket, seconds = await loop.run_in_executor(
+        executor, timed_call, parse_docket, result.body, result.encoding)
+    ingest_metrics.add_time('docket_parse', seconds)
+    return docket
+
+
+def extract_bill_id(bill_url):
+    match = re.search(r'[?&]lsr=(\d+)', bill_url, re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def get_bill_html_link(session_year, bill_id, base_url=BASE_URL):
+    return f"{base_url}?sy={session_year}&id={bill_id}&txtFormat=html"
+
+
+def get_bill_docket_link(session_year, bill_id, base_url=DOCKET_BASE_URL):
+    return f"{base_url}?lsr={bill_id}&sy={session_year}&txtsessionyear={session_year}"
+
+
+def feed_session_year(feed_url):
+    query = dict(parse_qsl(urlsplit(feed_url).query))
+    return query.get('txtsessionyear') or str(datetime.now().year)
+
+
+def session_feed_url(feed_url, session_year):
+    parts = urlsplit(feed_url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query['txtsessionyear'] = session_year
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def entry_summary(entry):
     summary = entry.get('description', entry.get('lsrtitle', ''))
     if isinstance(summary, dict):
         summary = summary.get('value', '')
-    summary = BeautifulSoup(summary, 'html.parser').get_text()
+    return summary
+
+
+def bill_fingerprint(entry):
+    fields = (entry.get('housestatus', ''), entry.get('senatestatus', ''),
+              entry.get('latestcommittee', ''), entry_summary(entry))
+    return hashlib.sha1('\x1f'.join(fields).encode('utf-8')).hexdigest()
+
+
+async def process_bill(session, entry, text_cache=None, executor=None,
+                       base_url=BASE_URL, progress=None, session_year=None,
+                       docket_base_url=DOCKET_BASE_URL, budget=None,
+                       new=False):
+    bill_number = entry.title
+    bill_url = entry.link
+    bill_id = extract_bill_id(bill_url)
+    session_year = entry.get('sessionyear') or session_year
+    html_link = get_bill_html_link(session_year, bill_id, base_url)
+    docket_link = get_bill_docket_link(session_year, bill_id, docket_base_url)
+
+    bill_text = await fetch_full_bill_text(
+        session, html_link, text_cache, executor, progress, budget)
 
-    return {
+    summary = strip_tags(entry_summary(entry))
+
+    bill_data = {
         'number': bill_number,
+        'session_year': session_year,
         'summary': summary,
         'sponsor': entry.get('latestcommittee', ''),
-        'last_updated': datetime.now(),
-        'status': f"House: {entry.get('housestatus', '')}, Senate: {entry.get('senatestatus', '')}",
-        'full_text': full_text,
+        'house_status': entry.get('housestatus', ''),
+        'senate_status': entry.get('senatestatus', ''),
         'html_link': html_link,
-        'category': category
+        'docket_link': docket_link,
+        # A failed fetch leaves no fingerprint so the next run retries it,
+        # even when the cached text stood in for it.
+        'fingerprint': bill_fingerprint(entry) if bill_text.fetched else None,
     }
+    # Unchanged texts are left out so the write phase doesn't rewrite them,
+    # unless the bill is new and needs its cached copy.
+    if bill_text.changed:
+        bill_data['full_text'] = bill_text.text
+        bill_data['category'] = bill_text.category
+        bill_data['category_scores'] = bill_text.scores
+    elif new and bill_text.text is not None:
+        loop = asyncio.get_running_loop()
+        (category, scores), seconds = await loop.run_in_executor(
+            executor, timed_call, classify_text, bill_text.text)
+        ingest_metrics.add_time('categorize', seconds)
+        bill_data['full_text'] = bill_text.text
+        bill_data['category'] = category
+        bill_data['category_scores'] = scores
+    # The docket only changes along with the status fields, so it is only
+    # fetched for bills that got here through a fingerprint change.
+    if bill_data['fingerprint']:
+        docket = await fetch_docket(session, docket_link, executor, budget)
+        if docket is None:
+            bill_data['fingerprint'] = None
+        else:
+            bill_data['docket'] = docket
+    # Exactly one of parsed/errors per bill, which is what the ETA counts.
+    if progress:
+        progress.advance('parsed' if bill_data['fingerprint'] else 'errors')
+    return bill_data
+
+
+async def iterate(items):
+    for item in items:
+        yield item
+
+
+async def chunked_async(items, size):
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def run_pipeline(entries, process, write, concurrency, batch_size):
+    """Process ``entries`` with ``concurrency`` workers, writing as they finish.
+
+    ``entries`` may be a plain or an async iterable, so processing can start
+    while the entries are still arriving. Results reach ``write`` in
+    completion order, ``batch_size`` at a time. The result queue is bounded,
+    so workers pause while a batch is written and at most a couple of
+    batches are held in memory. Exceptions from ``process`` are passed
+    through as results; one raised by ``entries`` is re-raised once the
+    results already in hand are written.
+    """
+    if not hasattr(entries, '__anext__'):
+        entries = iterate(entries)
+    results = asyncio.Queue(maxsize=batch_size)
+    finished = object()
+    # An async generator can't be advanced by two workers at once.
+    next_lock = asyncio.Lock()
+
+    async def worker():
+        while True:
+            async with next_lock:
+                try:
+                    entry = await entries.__anext__()
+                except StopAsyncIteration:
+                    return
+            try:
+                result = await process(entry)
+            except Exception as e:
+                result = e
+            await results.put(result)
+
+    async def close():
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            await results.put(finished)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    closer = asyncio.create_task(close())
+    batch = []
+    try:
+        while True:
+            result = await results.get()
+            if result is finished:
+                break
+            batch.append(result)
+            if len(batch) >= batch_size:
+                write(batch)
+                batch = []
+        if batch:
+            write(batch)
+        if closer.done() and closer.exception():
+            raise closer.exception()
+    finally:
+        for task in workers + [closer]:
+            task.cancel()
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def load_fingerprints(session_year, numbers, chunk_size=LOOKUP_CHUNK_SIZE):
+    fingerprints = {}
+    for chunk in chunked(numbers, chunk_size):
+        fingerprints.update(
+            db.session.query(Bill.number, Bill.fingerprint)
+            .filter(Bill.session_year == session_year, Bill.number.in_(chunk)))
+    return fingerprints
+
+
+def get_upsert_insert(dialect_name):
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def upsert_bills(rows, batch_size):
+    # Rows skip full_text/category when the text was unchanged, so each
+    # distinct column set gets its own statement.
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    insert = get_upsert_insert(db.engine.dialect.name)
+    for columns, group in groups.items():
+        if insert is None:
+            for batch in chunked(group, batch_size):
+                update_bills_by_number(batch)
+            continue
+        stmt = insert(Bill.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['session_year', 'number'],
+            set_={column: stmt.excluded[column]
+                  for column in columns
+                  if column not in ('session_year', 'number')})
+        for batch in chunked(group, batch_size):
+            db.session.execute(stmt, batch)
 
 
-async def update_bills_from_rss():
-    @cache.cached(timeout=3600, key_prefix='rss_feed')
-    def get_rss_feed():
-        return feedparser.parse(RSS_FEED_URL)
+def update_bills_by_number(rows):
+    existing = {(bill.session_year, bill.number): bill for bill in Bill.query.filter(
+        Bill.number.in_([row['number'] for row in rows]))}
+    for row in rows:
+        bill = existing.get((row['session_year'], row['number']))
+        if bill is None:
+            db.session.add(Bill(**row))
+            continue
+        for key, value in row.items():
+            setattr(bill, key, value)
+
+
+def load_bill_ids(keys, chunk_size=LOOKUP_CHUNK_SIZE):
+    """Map ``(session_year, number)`` keys to bill ids."""
+    numbers_by_session = {}
+    for session_year, number in keys:
+        numbers_by_session.setdefault(session_year, []).append(number)
+    bill_ids = {}
+    for session_year, numbers in numbers_by_session.items():
+        for chunk in chunked(numbers, chunk_size):
+            bill_ids.update(
+                ((session_year, number), bill_id)
+                for number, bill_id in db.session.query(Bill.number, Bill.id)
+                .filter(Bill.session_year == session_year, Bill.number.in_(chunk)))
+    return bill_ids
+
+
+def upcoming_hearing(docket, committee, today=None):
+    today = today or date.today()
+    hearings = [hearing for hearing in map(parse_hearing,
+                                           (action for _, _, action in docket))
+                if hearing and hearing[0] >= today]
+    if not hearings:
+        return None
+    hearing_date, time, location = min(hearings)
+    return {'committee': (committee or '')[:100], 'date': hearing_date,
+            'time': time[:20], 'location': location[:100]}
+
 
-    feed = get_rss_feed()
+def write_dockets(dockets, batch_size, chunk_size=LOOKUP_CHUNK_SIZE):
+    """Insert new docket actions and refresh each bill's next hearing.
 
-    async with aiohttp.ClientSession() as session:
-        tasks = [process_bill(session, entry) for entry in feed.entries]
-        bills_data = await asyncio.gather(*tasks, return_exceptions=True)
+    ``dockets`` maps bill ids to ``(docket, committee)``. Only the given
+    bills' stored entries are read, and entries already stored are skipped,
+    so the cost follows the number of changed bills.
+    """
+    stored = set()
+    hearings = {}
+    for chunk in chunked(list(dockets), chunk_size):
+        stored.update(tuple(row) for row in db.session.query(
+            DocketEntry.bill_id, DocketEntry.date, DocketEntry.chamber,
+            DocketEntry.action).filter(DocketEntry.bill_id.in_(chunk)))
+        hearings.update((hearing.bill_id, hearing) for hearing in
+                        Hearing.query.filter(Hearing.bill_id.in_(chunk)))
 
-    new_bills = []
-    updated_bills = []
+    new_entries = [
+        {'bill_id': bill_id, 'date': entry_date, 'chamber': chamber,
+         'action': action}
+        for bill_id, (docket, _) in dockets.items()
+        for entry_date, chamber, action in docket
+        if (bill_id, entry_date, chamber, action) not in stored]
+    for batch in chunked(new_entries, batch_size):
+        db.session.execute(DocketEntry.__table__.insert(), batch)
 
+    for bill_id, (docket, committee) in dockets.items():
+        upcoming = upcoming_hearing(docket, committee)
+        hearing = hearings.get(bill_id)
+        if upcoming is None:
+            if hearing is not None:
+                db.session.delete(hearing)
+        elif hearing is None:
+            db.session.add(Hearing(bill_id=bill_id, **upcoming))
+        else:
+            for key, value in upcoming.items():
+                setattr(hearing, key, value)
+    return len(new_entries)
+
+
+def write_bills(bills_data, existing_numbers, batch_size, progress=None):
+    rows = []
+    dockets = {}
+    new_count = 0
+    changed_count = 0
+    now = datetime.utcnow()
     for bill_data in bills_data:
         if isinstance(bill_data, Exception):
             logging.error(f"Error processing bill: {str(bill_data)}")
+            if progress:
+                progress.advance('errors')
             continue
-        existing_bill = Bill.query.filter_by(
-            number=bill_data['number']).first()
-        if existing_bill:
-            for key, value in bill_data.items():
-                setattr(existing_bill, key, value)
-            updated_bills.append(existing_bill)
-        else:
-            new_bills.append(Bill(**bill_data))
+        docket = bill_data.pop('docket', None)
+        if docket is not None:
+            # sponsor holds the feed's latest committee, which is the one
+            # holding the hearing.
+            dockets[(bill_data['session_year'], bill_data['number'])] = \
+                (docket, bill_data['sponsor'])
+        new = bill_data['number'] not in existing_numbers
+        if new:
+            new_count += 1
+            if 'full_text' not in bill_data:
+                # The text fetch failed with nothing cached; the placeholder
+                # is short enough to classify here.
+                bill_data['full_text'] = FETCH_FAILED_TEXT
+                bill_data['category'], bill_data['category_scores'] = \
+                    categorizer.classify(FETCH_FAILED_TEXT)
+        elif bill_data['fingerprint']:
+            changed_count += 1
+        # Stamped at write time, in UTC like the column default, so a sync
+        # reading ``updated_since`` never misses a batch that committed
+        # late. A bill whose fetch failed keeps its stamp until a later run
+        # gets through.
+        if new or bill_data['fingerprint']:
+            bill_data['last_updated'] = now
+        rows.append(bill_data)
+
+    with ingest_metrics.timer('db_write'):
+        upsert_bills(rows, batch_size)
+        if dockets:
+            bill_ids = load_bill_ids(dockets)
+            write_dockets({bill_ids[key]: docket
+                           for key, docket in dockets.items()
+                           if key in bill_ids}, batch_size)
+        db.session.commit()
+    if rows:
+        bump_data_generation()
+    ingest_metrics.inc('nh_ingest_bills_total', len(rows), result='written')
+    ingest_metrics.inc('nh_ingest_bills_total', len(bills_data) - len(rows),
+                       result='error')
+    ingest_metrics.publish()
+    if progress:
+        progress.advance('written', len(rows))
+    return new_count, changed_count
+
+
+async def changed_feed_entries(entries, session_year, known_fingerprints,
+                               on_chunk=None):
+    """Yield the streamed ``entries`` whose status fingerprint changed.
+
+    Stored fingerprints are looked up a chunk at a time and collected into
+    ``known_fingerprints``; ``on_chunk(changed, unchanged)`` gets each
+    chunk's counts.
+    """
+    async for chunk in chunked_async(entries, LOOKUP_CHUNK_SIZE):
+        fingerprints = load_fingerprints(
+            session_year, [entry.title for entry in chunk])
+        known_fingerprints.update(fingerprints)
+        changed = [entry for entry in chunk
+                   if fingerprints.get(entry.title) != bill_fingerprint(entry)]
+        ingest_metrics.inc('nh_ingest_bills_total', len(chunk) - len(changed),
+                           result='unchanged')
+        if on_chunk:
+            on_chunk(len(changed), len(chunk) - len(changed))
+        for entry in changed:
+            yield entry
+
+
+async def update_bills_from_rss(progress=None):
+    config = current_app.config
+    feed_url = config['RSS_FEED_URL']
+    session_year = feed_session_year(feed_url)
+    session = await ingest_loop.session(config)
+
+    batch_size = config['INGEST_WRITE_BATCH_SIZE']
+    counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+    known_fingerprints = {}
+    text_cache = open_text_cache(config)
+    executor = create_parse_executor(config)
+
+    def count_entries(changed, unchanged):
+        counts['unchanged'] += unchanged
+        if progress:
+            progress.add_total(changed, unchanged)
+
+    def write(batch):
+        # Each batch commits on its own, so a failed run keeps what it wrote.
+        new, changed = write_bills(batch, known_fingerprints.keys(),
+                                   batch_size, progress)
+        counts['new'] += new
+        counts['changed'] += changed
+
+    async def process(entry):
+        return await process_bill(
+            session, entry, text_cache, executor,
+            config['BILL_TEXT_BASE_URL'], progress, session_year,
+            config['BILL_DOCKET_BASE_URL'],
+            new=entry.title not in known_fingerprints)
+
+    entries = changed_feed_entries(iter_feed_entries(session, feed_url),
+                                   session_year, known_fingerprints,
+                                   count_entries)
+    run = ingest_metrics.start_run('update')
+    status = 'failed'
+    try:
+        await run_pipeline(entries, process, write,
+                           config['INGEST_MAX_CONCURRENCY'], batch_size)
+        status = 'complete'
+    except FeedError as e:
+        logging.error(str(e))
+        status = 'partial'
+    finally:
+        executor.shutdown()
+        text_cache.close()
+        ingest_metrics.finish_run(run, status, **counts)
+
+    return counts['new'], counts['changed'], counts['unchanged']
+
 
-    db.session.bulk_save_objects(new_bills)
-    db.session.bulk_save_objects(updated_bills)
-    db.session.commit()
+def update_bills(progress=None):
+    return ingest_loop.run(current_app._get_current_object(),
+                           update_bills_from_rss, progress)
 
-    return len(new_bills), len(updated_bills)
 
+def iter_keyset_chunks(query, key_column, chunk_size):
+    last_key = None
+    while True:
+        chunk_query = query
+        if last_key is not None:
+            chunk_query = chunk_query.filter(key_column > last_key)
+        rows = chunk_query.order_by(key_column).limit(chunk_size).all()
+        if not rows:
+            return
+        yield rows
+        last_key = rows[-1][0]
 
-def update_bills():
-    return asyncio.run(update_bills_from_rss())
 
+def update_bill_categories(recategorize_all=False, since=None,
+                           chunk_size=None, progress=None):
+    chunk_size = chunk_size or current_app.config['RECATEGORIZE_CHUNK_SIZE']
+    query = db.session.query(Bill.id, Bill.full_text)
+    if not recategorize_all:
+        query = query.filter(Bill.category.is_(None))
+    if since is not None:
+        query = query.filter(Bill.last_updated >= since)
 
-def update_bill_categories():
-    uncategorized_bills = Bill.query.filter(Bill.category.is_(None)).all()
-    for bill in uncategorized_bills:
-        bill.category = categorize_bill(bill.full_text)
-    db.session.commit()
-    print(f"Categorized {len(uncategorized_bills)} bills.")
+    categorized = 0
+    for rows in iter_keyset_chunks(query, Bill.id, chunk_size):
+        results = categorizer.classify_many(row.full_text for row in rows)
+        db.session.bulk_update_mappings(Bill, [
+            {'id': row.id, 'category': category, 'category_scores': scores}
+            for row, (category, scores) in zip(rows, results)])
+        db.session.commit()
+        bump_data_generation()
+        categorized += len(rows)
+        if progress:
+            progress(categorized)
+    print(f"Categorized {categorized} bills.")
+    return categorized
 
 
 if __name__ == "__main__":
     from app import create_app
     app = create_app()
     with app.app_context():
-        new, updated = update_bills()
+        new, updated, unchanged = update_bills()
         print(
-            f"Added {new} new bills and updated {updated} bills at {datetime.now()}")
+            f"Added {new} new bills, updated {updated} bills and skipped "
+            f"{unchanged} unchanged bills at {datetime.now()}")
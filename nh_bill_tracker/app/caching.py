@@ -0,0 +1,58 @@
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from flask import current_app, request, session
+from flask_login import current_user
+from app.extensions import cache
+
+# Cached pages are keyed by the current data generation. Every commit that
+# changes bills replaces the generation, so stale pages simply stop being
+# looked up instead of waiting out a timeout. A fresh random token (rather
+# than a counter) means an evicted generation key can never resurrect old
+# entries.
+GENERATION_KEY = 'data_generation'
+
+
+def data_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, timeout=0)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_data_generation():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, timeout=0)
+
+
+def cached_count(query, *signature):
+    """Row count for ``query``, computed once per data generation.
+
+    Returns None when PAGINATION_COUNT_TOTALS is off.
+    """
+    if not current_app.config['PAGINATION_COUNT_TOTALS']:
+        return None
+    digest = hashlib.md5(repr(signature).encode('utf-8')).hexdigest()
+    key = f'count:{data_generation()}:{digest}'
+    total = cache.get(key)
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(key, total)
+    return total
+
+
+def page_cache_key(*args, **kwargs):
+    query = urlencode(sorted(request.args.items(multi=True)))
+    query_hash = hashlib.md5(query.encode('utf-8')).hexdigest()
+    return f'page:{data_generation()}:{request.path}:{query_hash}'
+
+
+def skip_page_cache():
+    # Pages include the login-dependent nav bar and flashed messages, so
+    # only plain anonymous views are shared.
+    return current_user.is_authenticated or bool(session.get('_flashes'))
+
+
+cached_page = cache.cached(make_cache_key=page_cache_key,
+                           unless=skip_page_cache)
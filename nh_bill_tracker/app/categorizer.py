@@ -0,0 +1,65 @@
+import re
+from collections import Counter
+
+DEFAULT_CATEGORY = 'Other'
+
+CATEGORY_KEYWORDS = {
+    'Education': ['education', 'educational', 'school', 'student', 'teacher',
+                  'university', 'college'],
+    'Health': ['health', 'medical', 'hospital', 'doctor', 'patient',
+               'healthcare'],
+    'Transportation': ['transport', 'transportation', 'road', 'highway',
+                       'vehicle', 'traffic', 'transit'],
+    'Environment': ['environment', 'environmental', 'climate', 'pollution',
+                    'energy', 'conservation'],
+    'Economy': ['economy', 'economic', 'tax', 'budget', 'finance', 'business',
+                'employment'],
+    'Public Safety': ['police', 'crime', 'prison', 'fire', 'emergency',
+                      'safety'],
+    'Housing': ['housing', 'rent', 'property', 'zoning', 'development'],
+}
+
+
+class Categorizer:
+    """Keyword categorizer compiled into one word-boundary regex.
+
+    Each category is a named group of its keywords (plurals allowed), so a
+    single case-insensitive ``finditer`` pass over a text yields hit counts
+    for every category at once.
+    """
+
+    def __init__(self, keywords=CATEGORY_KEYWORDS, default=DEFAULT_CATEGORY):
+        self.default = default
+        self.categories = list(keywords)
+        groups = []
+        for index, category in enumerate(self.categories):
+            words = sorted(keywords[category], key=len, reverse=True)
+            alternation = '|'.join(re.escape(word) for word in words)
+            groups.append(f'(?P<c{index}>{alternation})')
+        self.pattern = re.compile(
+            r'\b(?:' + '|'.join(groups) + r')(?:e?s)?\b', re.IGNORECASE)
+
+    def hit_counts(self, text):
+        counts = Counter(match.lastgroup for match in
+                         self.pattern.finditer(text or ''))
+        return {self.categories[int(group[1:])]: count
+                for group, count in counts.items()}
+
+    def scores(self, text):
+        counts = self.hit_counts(text)
+        total = sum(counts.values())
+        # Ties keep the declaration order of CATEGORY_KEYWORDS.
+        ordered = sorted(counts, key=lambda c: (-counts[c], self.categories.index(c)))
+        return {category: round(counts[category] / total, 4)
+                for category in ordered}
+
+    def classify(self, text):
+        scores = self.scores(text)
+        category = next(iter(scores), self.default)
+        return category, scores
+
+    def classify_many(self, texts):
+        return [self.classify(text) for text in texts]
+
+
+categorizer = Categorizer()
@@ -1,7 +1,12 @@
 import click
 from flask.cli import with_appcontext
 from app.extensions import db
-from app.models import User
+from app.models import BackfillCheckpoint, Bill, User
+from app.search import rebuild_search_index
+from app.bill_tracker import update_bill_categories
+from app.export import EXPORT_FORMATS, EXPORT_MODELS, export_table
+from app.backfill import backfill, parse_sessions
+from app.locks import single_flight
 
 
 @click.command('create-superuser')
@@ -29,6 +34,101 @@ def make_superuser(email):
     db.session.commit()
     click.echo(f'User {user.username} is now a superuser.')
 
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('Full-text search index is only available on SQLite.')
+        return
+    rebuild_search_index()
+    click.echo('Search index rebuilt.')
+
+
+@click.command('recategorize')
+@click.option('--all', 'recategorize_all', is_flag=True,
+              help='Recategorize every bill, not just uncategorized ones.')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Only bills updated on or after this date.')
+@click.option('--chunk-size', type=int, default=None)
+@with_appcontext
+def recategorize(recategorize_all, since, chunk_size):
+    query = Bill.query
+    if not recategorize_all:
+        query = query.filter(Bill.category.is_(None))
+    if since is not None:
+        query = query.filter(Bill.last_updated >= since)
+    total = query.count()
+
+    def report(done):
+        click.echo(f'Categorized {done}/{total} bills...')
+
+    with single_flight('recategorize') as acquired:
+        if not acquired:
+            raise click.ClickException('Recategorization is already running.')
+        update_bill_categories(recategorize_all=recategorize_all, since=since,
+                               chunk_size=chunk_size, progress=report)
+
+
+@click.command('export-bills')
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@click.option('--table', 'table_name', type=click.Choice(list(EXPORT_MODELS)),
+              default='bill', show_default=True)
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS),
+              default='csv', show_default=True)
+@click.option('--columns', help='Comma-separated column names (default: all).')
+@click.option('--session-year', help='Only rows for bills from this session.')
+@click.option('--compression',
+              type=click.Choice(['none', 'gzip', 'snappy', 'zstd']),
+              default='none', show_default=True,
+              help='gzip for CSV/JSONL; any codec for Parquet.')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=5000, show_default=True)
+@with_appcontext
+def export_bills(output, table_name, fmt, columns, session_year, compression,
+                 chunk_size):
+    if fmt != 'parquet' and compression in ('snappy', 'zstd'):
+        raise click.BadParameter(f'{compression} is only supported for Parquet',
+                                 param_hint='--compression')
+    column_names = [c.strip() for c in columns.split(',')] if columns else None
+    try:
+        count = export_table(table_name, output, fmt, column_names, session_year,
+                             None if compression == 'none' else compression,
+                             chunk_size)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Exported {count} {table_name} rows to {output}.')
+
+
+@click.command('backfill')
+@click.option('--sessions', required=True,
+              help='Session years, e.g. 2016-2025 or 2016,2019-2021.')
+@click.option('--max-requests', type=int, default=None,
+              help='Stop after this many HTTP requests, retries included; '
+                   'rerun to resume.')
+@click.option('--refresh', is_flag=True,
+              help='Recheck sessions already marked complete.')
+@with_appcontext
+def backfill_command(sessions, max_requests, refresh):
+    try:
+        session_years = parse_sessions(sessions)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--sessions')
+
+    def report(checkpoint):
+        click.echo(f'{checkpoint.session_year}: {checkpoint.completed}/'
+                   f'{checkpoint.total} bills, {checkpoint.failed} failed')
+
+    with single_flight('bill-ingest') as acquired:
+        if not acquired:
+            raise click.ClickException('A bill update is already running.')
+        backfill(session_years, max_requests, refresh, report)
+    checkpoints = BackfillCheckpoint.query.filter(
+        BackfillCheckpoint.session_year.in_(session_years)) \
+        .order_by(BackfillCheckpoint.session_year)
+    for checkpoint in checkpoints:
+        click.echo(f'{checkpoint.session_year}: {checkpoint.status} '
+                   f'({checkpoint.completed}/{checkpoint.total} bills)')
+
 # Don't forget to register the new command in your app/__init__.py
 # Add this line in the create_app function:
 # app.cli.add_command(make_superuser)
@@ -0,0 +1,138 @@
+import csv
+import gzip
+import json
+from datetime import date, datetime
+
+from sqlalchemy import JSON, Boolean, Date, DateTime, Integer
+from app.extensions import db
+from app.models import Bill, DocketEntry, Hearing
+from app.pagination import SortKey, iter_keyset_rows
+
+EXPORT_MODELS = {
+    'bill': Bill,
+    'docket_entry': DocketEntry,
+    'hearing': Hearing,
+}
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def export_columns(model, names=None):
+    table = model.__table__
+    if not names:
+        return list(table.columns)
+    unknown = [name for name in names if name not in table.columns]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for {table.name}: {', '.join(unknown)}")
+    return [table.columns[name] for name in names]
+
+
+def export_query(model, columns, session_year=None):
+    table = model.__table__
+    query = db.session.query(table.c.id.label('export_key'), *columns)
+    if session_year:
+        if model is Bill:
+            query = query.filter(table.c.session_year == session_year)
+        else:
+            query = query.join(Bill.__table__, table.c.bill_id == Bill.id) \
+                .filter(Bill.session_year == session_year)
+    return query
+
+
+def serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_export_rows(model, columns, session_year=None, chunk_size=5000):
+    id_key = SortKey(model.__table__.c.id, lambda row: row[0])
+    query = export_query(model, columns, session_year)
+    for row in iter_keyset_rows(query, [id_key], chunk_size):
+        yield row[1:]
+
+
+def open_text_output(path, compression):
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def write_csv(rows, columns, path, compression):
+    count = 0
+    with open_text_output(path, compression) as output:
+        writer = csv.writer(output)
+        writer.writerow([column.name for column in columns])
+        for row in rows:
+            writer.writerow([json.dumps(v) if isinstance(v, (dict, list)) else serialize(v)
+                             for v in row])
+            count += 1
+    return count
+
+
+def write_jsonl(rows, columns, path, compression):
+    names = [column.name for column in columns]
+    count = 0
+    with open_text_output(path, compression) as output:
+        for row in rows:
+            output.write(json.dumps(dict(zip(names, row)), default=serialize))
+            output.write('\n')
+            count += 1
+    return count
+
+
+def arrow_type(pa, column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def write_parquet(rows, columns, path, compression, chunk_size=5000):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet export requires pyarrow (pip install pyarrow)')
+
+    schema = pa.schema([(column.name, arrow_type(pa, column)) for column in columns])
+    json_columns = [i for i, column in enumerate(columns)
+                    if isinstance(column.type, JSON)]
+    count = 0
+    with pq.ParquetWriter(path, schema, compression=compression or 'none') as writer:
+        batch = []
+
+        def flush():
+            data = list(zip(*batch))
+            for i in json_columns:
+                data[i] = [json.dumps(v) if v is not None else None for v in data[i]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type)
+                 for values, field in zip(data, schema)], schema=schema))
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                flush()
+                count += len(batch)
+                batch = []
+        if batch:
+            flush()
+            count += len(batch)
+    return count
+
+
+def export_table(table_name, path, fmt, column_names=None, session_year=None,
+                 compression=None, chunk_size=5000):
+    model = EXPORT_MODELS[table_name]
+    columns = export_columns(model, column_names)
+    rows = iter_export_rows(model, columns, session_year, chunk_size)
+    if fmt == 'csv':
+        return write_csv(rows, columns, path, compression)
+    if fmt == 'jsonl':
+        return write_jsonl(rows, columns, path, compression)
+    return write_parquet(rows, columns, path, compression, chunk_size)
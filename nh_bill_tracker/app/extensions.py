@@ -8,7 +8,7 @@ db = SQLAlchemy()
 migrate = Migrate()
 login = LoginManager()
 login.login_view = 'auth.login'
-cache = Cache(config={'CACHE_TYPE': 'simple'})
+cache = Cache()
 scheduler = BackgroundScheduler()
 
 # Remove the Admin instance from here
@@ -0,0 +1,81 @@
+import asyncio
+import atexit
+import threading
+
+import aiohttp
+
+from app.ratelimit import host_policies
+
+
+def create_ingest_session(config):
+    connector = aiohttp.TCPConnector(
+        limit=config['INGEST_MAX_CONNECTIONS'],
+        limit_per_host=config['INGEST_PER_HOST_LIMIT'],
+        use_dns_cache=True,
+        ttl_dns_cache=config['INGEST_DNS_CACHE_TTL'],
+        keepalive_timeout=config['INGEST_KEEPALIVE_TIMEOUT'])
+    return aiohttp.ClientSession(connector=connector)
+
+
+class IngestLoop:
+    """Event loop thread that owns the ingest HTTP session.
+
+    Scheduled runs, admin jobs and CLI commands all submit coroutines here,
+    so they share one connection pool, DNS cache and set of keep-alive
+    connections for the life of the process. The thread is started on
+    first use, never at import, so forking servers don't inherit it.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.http_session = None
+        self.lock = threading.Lock()
+        self.registered = False
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self.loop.run_forever,
+                                           name='ingest-loop', daemon=True)
+            self.thread.start()
+            if not self.registered:
+                atexit.register(self.stop)
+                self.registered = True
+
+    async def session(self, config):
+        # Runs on the loop thread, where the session has to be created.
+        host_policies.configure(config)
+        if self.http_session is None or self.http_session.closed:
+            self.http_session = create_ingest_session(config)
+        return self.http_session
+
+    def submit(self, app, coro_func, *args):
+        """Schedule ``coro_func(*args)`` in an app context; returns a Future."""
+        self.start()
+
+        async def run():
+            with app.app_context():
+                return await coro_func(*args)
+
+        return asyncio.run_coroutine_threadsafe(run(), self.loop)
+
+    def run(self, app, coro_func, *args):
+        return self.submit(app, coro_func, *args).result()
+
+    def stop(self):
+        with self.lock:
+            if self.loop is None:
+                return
+            if self.http_session is not None and self.thread.is_alive():
+                asyncio.run_coroutine_threadsafe(
+                    self.http_session.close(), self.loop).result(timeout=5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.loop.close()
+            self.loop = self.thread = self.http_session = None
+
+
+ingest_loop = IngestLoop()
@@ -0,0 +1,169 @@
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from app.extensions import cache
+from app.locks import single_flight
+
+JOB_KEY = 'ingest_job:{}'
+CURRENT_JOB_KEY = 'ingest_job:current'
+JOB_TTL = 24 * 3600
+# A running job republishes at least this often, so one that has gone quiet
+# for JOB_STALE_AFTER died with its worker.
+HEARTBEAT_INTERVAL = 15
+JOB_STALE_AFTER = 120
+
+# One background ingest per process; the single_flight lock makes it one
+# per deployment.
+job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingest-job')
+
+
+class IngestProgress:
+    """Counters for one ingest run, published to the shared cache.
+
+    Publishing is throttled so thousands of per-bill updates cost a handful
+    of cache writes. The cache backend is captured up front so updates work
+    outside an app context.
+    """
+
+    PUBLISH_INTERVAL = 1.0
+    COUNTERS = ('fetched', 'parsed', 'written', 'unchanged', 'errors')
+
+    def __init__(self, job_id=None):
+        self.job_id = job_id
+        self.backend = cache.cache if job_id else None
+        self.state = 'queued'
+        self.total = None
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+        self.message = None
+        self.started_at = None
+        self.finished_at = None
+        self.updated_at = None
+        self.last_publish = 0.0
+
+    def start(self):
+        self.state = 'running'
+        self.started_at = time.time()
+        self.publish(force=True)
+
+    def add_total(self, total, unchanged=0):
+        # Totals grow as the feed streams in.
+        self.total = (self.total or 0) + total
+        self.counts['unchanged'] += unchanged
+        self.publish()
+
+    def advance(self, counter, amount=1):
+        self.counts[counter] += amount
+        self.publish()
+
+    def finish(self, state, message=None):
+        self.state = state
+        self.message = message
+        self.finished_at = time.time()
+        self.publish(force=True)
+
+    def eta_seconds(self):
+        if self.state != 'running' or not self.total or not self.started_at:
+            return None
+        done = self.counts['parsed'] + self.counts['errors']
+        if not done:
+            return None
+        rate = done / (time.time() - self.started_at)
+        return round(max(self.total - done, 0) / rate, 1)
+
+    def as_dict(self):
+        return {
+            'id': self.job_id,
+            'state': self.state,
+            'total': self.total,
+            'message': self.message,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'updated_at': self.updated_at,
+            'eta_seconds': self.eta_seconds(),
+            **self.counts,
+        }
+
+    def publish(self, force=False):
+        if self.backend is None:
+            return
+        now = time.time()
+        if not force and now - self.last_publish < self.PUBLISH_INTERVAL:
+            return
+        self.last_publish = now
+        self.updated_at = now
+        self.backend.set(JOB_KEY.format(self.job_id), self.as_dict(),
+                         timeout=JOB_TTL)
+
+
+def get_job(job_id):
+    job = cache.get(JOB_KEY.format(job_id))
+    if job and job['state'] in ('queued', 'running') and \
+            time.time() - (job.get('updated_at') or 0) > JOB_STALE_AFTER:
+        job = dict(job, state='lost',
+                   message='The worker running this update stopped responding.')
+    return job
+
+
+def current_job():
+    job_id = cache.get(CURRENT_JOB_KEY)
+    job = get_job(job_id) if job_id else None
+    if job and job['state'] in ('queued', 'running'):
+        return job
+    return None
+
+
+def start_ingest_job(app):
+    """Queue a background ingest, or return the id of the one in flight."""
+    job = current_job()
+    if job:
+        return job['id'], False
+
+    progress = IngestProgress(uuid.uuid4().hex)
+    progress.publish(force=True)
+    # add() is atomic, so of two concurrent clicks only one queues a job.
+    # A pointer left by a finished or dead job is taken over.
+    if not cache.add(CURRENT_JOB_KEY, progress.job_id, timeout=JOB_TTL):
+        job = current_job()
+        if job:
+            return job['id'], False
+        cache.set(CURRENT_JOB_KEY, progress.job_id, timeout=JOB_TTL)
+    job_executor.submit(run_ingest_job, app, progress)
+    return progress.job_id, True
+
+
+def run_ingest_job(app, progress):
+    from app.bill_tracker import update_bills_from_rss
+    from app.ingest_loop import ingest_loop
+
+    with app.app_context():
+        try:
+            with single_flight('bill-ingest') as acquired:
+                if not acquired:
+                    progress.finish('skipped',
+                                    'Another bill update is already running.')
+                    return
+                cache.set(CURRENT_JOB_KEY, progress.job_id, timeout=JOB_TTL)
+                progress.start()
+                future = ingest_loop.submit(app, update_bills_from_rss, progress)
+                try:
+                    while True:
+                        try:
+                            new, changed, unchanged = future.result(
+                                timeout=HEARTBEAT_INTERVAL)
+                            break
+                        except FutureTimeoutError:
+                            progress.publish(force=True)
+                except Exception as e:
+                    logging.exception('Background bill update failed')
+                    progress.finish('failed', str(e))
+                    return
+                progress.finish(
+                    'finished',
+                    f'Added {new} new bills, updated {changed} bills '
+                    f'and skipped {unchanged} unchanged bills.')
+        finally:
+            if cache.get(CURRENT_JOB_KEY) == progress.job_id:
+                cache.delete(CURRENT_JOB_KEY)
@@ -0,0 +1,64 @@
+import logging
+import os
+import zlib
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import text
+from app.extensions import db
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def single_flight(name):
+    """Cross-process, non-blocking lock; yields whether it was acquired.
+
+    PostgreSQL deployments use a session advisory lock so the lock spans
+    hosts; everything else falls back to an exclusive lock file in
+    INGEST_LOCK_DIR.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        with _advisory_lock(name) as acquired:
+            yield acquired
+    else:
+        with _file_lock(name) as acquired:
+            yield acquired
+
+
+@contextmanager
+def _advisory_lock(name):
+    key = zlib.crc32(name.encode('utf-8'))
+    with db.engine.connect() as connection:
+        acquired = connection.execute(
+            text('SELECT pg_try_advisory_lock(:key)'), {'key': key}).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.execute(
+                    text('SELECT pg_advisory_unlock(:key)'), {'key': key})
+
+
+@contextmanager
+def _file_lock(name):
+    lock_dir = current_app.config['INGEST_LOCK_DIR']
+    os.makedirs(lock_dir, exist_ok=True)
+    fd = os.open(os.path.join(lock_dir, f'{name}.lock'), os.O_RDWR | os.O_CREAT)
+    try:
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            logging.info(f"Lock {name} is held by another process")
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)
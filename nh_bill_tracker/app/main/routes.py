@@ -1,35 +1,102 @@
-from flask import render_template, request, current_app, flash, redirect, url_for
+from flask import render_template, request, current_app, flash, redirect, url_for, g, abort
 from flask_login import current_user, login_required
 from app.main import bp
-from app.models import Bill, User
+from app.models import Bill, DocketEntry, User, user_bills
 from app.extensions import db
+from app.caching import cached_page, cached_count
+from app.metrics import render_metrics
+from app.pagination import KeysetPage, SortKey, BILL_RECENCY_KEYS
+from app.search import has_search_index, search_bills_query, \
+    highlight_snippet, bm25_rank
 from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload, load_only
+
+
+def tracked_bill_ids():
+    # Loaded at most once per request, from the association table only.
+    if not current_user.is_authenticated:
+        return frozenset()
+    if 'tracked_bill_ids' not in g:
+        g.tracked_bill_ids = {bill_id for (bill_id,) in db.session.query(
+            user_bills.c.bill_id).filter(user_bills.c.user_id == current_user.id)}
+    return g.tracked_bill_ids
+
+
+@bp.app_context_processor
+def inject_tracked_bill_ids():
+    return {'tracked_bill_ids': tracked_bill_ids}
+
+
+def bill_id_or_404(bill_number, session_year=None):
+    row = Bill.by_number(bill_number, session_year,
+                         db.session.query(Bill.id)).first()
+    if row is None:
+        abort(404)
+    return row.id
+
+
+# Full-text matches as (Bill, snippet, rank) rows, best BM25 score first.
+RELEVANCE_KEYS = [SortKey(bm25_rank, lambda row: row[2]),
+                  SortKey(Bill.id, lambda row: row[0].id)]
 
 
 @bp.route('/')
 @bp.route('/index')
+@cached_page
 def index():
-    page = request.args.get('page', 1, type=int)
-    bills = Bill.query.order_by(Bill.last_updated.desc()).paginate(
-        page=page, per_page=current_app.config['BILLS_PER_PAGE'], error_out=False)
+    bills = KeysetPage(Bill.card_query(), BILL_RECENCY_KEYS,
+                       cursor=request.args.get('cursor'),
+                       per_page=current_app.config['BILLS_PER_PAGE'],
+                       total=cached_count(Bill.query, 'index'))
     return render_template('index.html', title='Home', bills=bills)
 
 
 @bp.route('/bill/<bill_number>')
+@cached_page
 def bill_detail(bill_number):
-    bill = Bill.query.filter_by(number=bill_number).first_or_404()
-    return render_template('bill_detail.html', title=f'Bill {bill_number}', bill=bill)
+    bill = Bill.by_number(bill_number, request.args.get('session_year'),
+                          Bill.query.options(joinedload(Bill.next_hearing))) \
+        .first_or_404()
+    docket_entries = latest_docket_entries(bill.id).limit(
+        current_app.config['DOCKET_ENTRIES_PREVIEW']).all()
+    return render_template('bill_detail.html', title=f'Bill {bill_number}',
+                           bill=bill, docket_entries=docket_entries)
+
+
+def latest_docket_entries(bill_id):
+    return DocketEntry.query.filter_by(bill_id=bill_id) \
+        .order_by(DocketEntry.date.desc(), DocketEntry.id.desc())
+
+
+@bp.route('/bill/<bill_number>/docket')
+@cached_page
+def bill_docket(bill_number):
+    bill = Bill.by_number(bill_number, request.args.get('session_year'),
+                          Bill.query.options(load_only(
+                              Bill.number, Bill.session_year, Bill.docket_link))) \
+        .first_or_404()
+    entries = latest_docket_entries(bill.id).paginate(
+        page=request.args.get('page', 1, type=int),
+        per_page=current_app.config['DOCKET_ENTRIES_PER_PAGE'],
+        error_out=False)
+    return render_template('bill_docket.html',
+                           title=f'Bill {bill_number} Docket',
+                           bill=bill, entries=entries)
 
 
 @bp.route('/search')
+@cached_page
 def search():
     query = request.args.get('query', '')
     category = request.args.get('category', '')
     sponsor = request.args.get('sponsor', '')
     status = request.args.get('status', '')
 
-    bills = Bill.query
-    if query:
+    bills = Bill.card_query()
+    use_fts = bool(query) and has_search_index()
+    if use_fts:
+        bills = search_bills_query(bills, query)
+    elif query:
         bills = bills.filter(or_(Bill.number.contains(query),
                                  Bill.summary.contains(query),
                                  Bill.full_text.contains(query)))
@@ -40,44 +107,65 @@ def search():
     if status:
         bills = bills.filter(Bill.status == status)
 
-    bills = bills.order_by(Bill.last_updated.desc()).paginate(
-        page=request.args.get('page', 1, type=int),
-        per_page=20,
-        error_out=False
-    )
+    total = cached_count(bills.with_entities(Bill.id), 'search',
+                         query, category, sponsor, status)
+    cursor = request.args.get('cursor')
+    if use_fts:
+        bills = KeysetPage(bills, RELEVANCE_KEYS, cursor=cursor, per_page=20,
+                           descending=False, total=total)
+        snippets = {bill.id: highlight_snippet(snippet)
+                    for bill, snippet, _ in bills.rows}
+        bills.items = [bill for bill, _, _ in bills.rows]
+    else:
+        bills = KeysetPage(bills, BILL_RECENCY_KEYS, cursor=cursor, per_page=20,
+                           total=total)
+        snippets = {}
 
-    return render_template('search_results.html', bills=bills, query=query)
+    return render_template('search_results.html', bills=bills, query=query,
+                           snippets=snippets)
 
 
 @bp.route('/track/<bill_number>')
 @login_required
 def track_bill(bill_number):
-    bill = Bill.query.filter_by(number=bill_number).first_or_404()
-    if bill not in current_user.tracked_bills:
-        current_user.tracked_bills.append(bill)
+    session_year = request.args.get('session_year')
+    bill_id = bill_id_or_404(bill_number, session_year)
+    already_tracked = db.session.query(user_bills).filter_by(
+        user_id=current_user.id, bill_id=bill_id).first()
+    if already_tracked is None:
+        db.session.execute(user_bills.insert().values(
+            user_id=current_user.id, bill_id=bill_id))
         db.session.commit()
         flash(f'You are now tracking Bill {bill_number}', 'success')
-    return redirect(url_for('main.bill_detail', bill_number=bill_number))
+    return redirect(url_for('main.bill_detail', bill_number=bill_number,
+                            session_year=session_year))
 
 
 @bp.route('/untrack/<bill_number>')
 @login_required
 def untrack_bill(bill_number):
-    bill = Bill.query.filter_by(number=bill_number).first_or_404()
-    if bill in current_user.tracked_bills:
-        current_user.tracked_bills.remove(bill)
-        db.session.commit()
+    session_year = request.args.get('session_year')
+    bill_id = bill_id_or_404(bill_number, session_year)
+    result = db.session.execute(user_bills.delete().where(
+        user_bills.c.user_id == current_user.id,
+        user_bills.c.bill_id == bill_id))
+    db.session.commit()
+    if result.rowcount:
         flash(f'You are no longer tracking Bill {bill_number}', 'success')
-    return redirect(url_for('main.bill_detail', bill_number=bill_number))
+    return redirect(url_for('main.bill_detail', bill_number=bill_number,
+                            session_year=session_year))
 
 
 @bp.route('/my-tracked-bills')
 @login_required
 def tracked_bills():
-    return render_template('tracked_bills.html', bills=current_user.tracked_bills)
+    bills = Bill.card_query().join(user_bills).filter(
+        user_bills.c.user_id == current_user.id)
+    return render_template('tracked_bills.html', bills=bills)
 
 
 @bp.route('/bill-categories')
+@cached_page
 def bill_categories():
     category_counts = db.session.query(Bill.category, func.count(Bill.id)).\
         group_by(Bill.category).all()
@@ -86,3 +174,11 @@ def bill_categories():
     counts = [c[1] for c in category_counts]
 
     return render_template('bill_categories.html', categories=categories, counts=counts)
+
+
+@bp.route('/metrics')
+def metrics():
+    # Prometheus scrape target; reads the totals ingest runs publish to the
+    # shared cache, so any worker can serve it.
+    return render_metrics(), 200, {
+        'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
@@ -0,0 +1,179 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from app.extensions import cache
+
+METRICS_KEY = 'ingest_metrics'
+# Under the app logger, which create_app sets to log INFO.
+logger = logging.getLogger(__name__)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_FAMILIES = {
+    'nh_ingest_http_requests_total': (
+        'counter', 'Ingest HTTP attempts by response status ("error" if none).'),
+    'nh_ingest_http_retries_total': (
+        'counter', 'Ingest HTTP attempts that were retried.'),
+    'nh_ingest_http_response_bytes_total': (
+        'counter', 'Response body bytes downloaded by ingest.'),
+    'nh_ingest_http_request_duration_seconds': (
+        'histogram', 'Time from sending an ingest request to its response headers.'),
+    'nh_ingest_stage_seconds': (
+        'summary', 'Time spent per ingest stage, summed across concurrent workers.'),
+    'nh_ingest_bills_total': (
+        'counter', 'Feed entries handled by ingest, by result.'),
+    'nh_ingest_runs_total': (
+        'counter', 'Finished ingest runs by kind and status.'),
+    'nh_ingest_last_run_timestamp_seconds': (
+        'gauge', 'Unix time the last ingest run of each kind finished.'),
+    'nh_ingest_last_run_duration_seconds': (
+        'gauge', 'Wall time of the last ingest run of each kind.'),
+}
+
+
+class IngestMetrics:
+    """Process-wide ingest counters, merged into the shared cache.
+
+    Samples are kept as a Counter keyed by ``(name, labels)``. Only the
+    ingest loop thread updates them; ``publish`` adds what changed since
+    the last publish to the totals in the cache, so /metrics shows every
+    process's runs whichever worker serves it.
+    """
+
+    PUBLISH_INTERVAL = 5.0
+
+    def __init__(self):
+        self.values = Counter()
+        self.published = Counter()
+        self.last_publish = 0.0
+
+    def inc(self, name, amount=1, **labels):
+        self.values[(name, tuple(sorted(labels.items())))] += amount
+
+    def observe_latency(self, seconds):
+        name = 'nh_ingest_http_request_duration_seconds'
+        for bound in LATENCY_BUCKETS:
+            if seconds <= bound:
+                self.inc(f'{name}_bucket', le=str(bound))
+        self.inc(f'{name}_bucket', le='+Inf')
+        self.inc(f'{name}_sum', seconds)
+        self.inc(f'{name}_count')
+
+    def add_time(self, stage, seconds):
+        self.inc('nh_ingest_stage_seconds_sum', seconds, stage=stage)
+        self.inc('nh_ingest_stage_seconds_count', stage=stage)
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+
+    def start_run(self, kind):
+        return {'kind': kind, 'started_at': time.monotonic(),
+                'baseline': Counter(self.values)}
+
+    def finish_run(self, run, status, **counts):
+        """Record the run, log its summary and publish the totals."""
+        duration = time.monotonic() - run['started_at']
+        self.inc('nh_ingest_runs_total', kind=run['kind'], status=status)
+        summary = {'event': 'ingest_run', 'kind': run['kind'],
+                   'status': status, 'duration_s': round(duration, 3),
+                   **counts, **summarize(self.values - run['baseline'])}
+        logger.info(f"Ingest run finished {json.dumps(summary, sort_keys=True)}")
+        self.publish(force=True, last_run={
+            'kind': run['kind'], 'finished_at': time.time(),
+            'duration': duration})
+        return summary
+
+    def publish(self, force=False, last_run=None):
+        now = time.monotonic()
+        if not force and now - self.last_publish < self.PUBLISH_INTERVAL:
+            return
+        self.last_publish = now
+        delta = self.values - self.published
+        self.published = Counter(self.values)
+        # Runs are single-flight per deployment, so the read-modify-write
+        # doesn't race with another publisher in practice.
+        state = cache.get(METRICS_KEY) or {'values': Counter(), 'last_runs': {}}
+        state['values'].update(delta)
+        if last_run:
+            state['last_runs'][last_run['kind']] = last_run
+        cache.set(METRICS_KEY, state, timeout=0)
+
+
+def summarize(delta):
+    def total(name, **labels):
+        return sum(value for (sample, sample_labels), value in delta.items()
+                   if sample == name and
+                   labels.items() <= dict(sample_labels).items())
+
+    requests = total('nh_ingest_http_request_duration_seconds_count')
+    latency = total('nh_ingest_http_request_duration_seconds_sum')
+    return {
+        'http_requests': requests,
+        'http_errors': total('nh_ingest_http_requests_total', status='error'),
+        'http_retries': total('nh_ingest_http_retries_total'),
+        'http_bytes': total('nh_ingest_http_response_bytes_total'),
+        'http_latency_mean_s': round(latency / requests, 4) if requests else None,
+        'stage_seconds': {
+            dict(labels)['stage']: round(value, 3)
+            for (sample, labels), value in sorted(delta.items())
+            if sample == 'nh_ingest_stage_seconds_sum'},
+    }
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def format_sample(name, labels, value):
+    if labels:
+        name += '{' + ','.join(f'{key}="{escape_label(label)}"'
+                               for key, label in labels) + '}'
+    return f'{name} {value!r}'
+
+
+def family_of(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in METRIC_FAMILIES:
+            return name[:-len(suffix)]
+    return name
+
+
+def render_metrics():
+    """The published ingest metrics in Prometheus text format."""
+    state = cache.get(METRICS_KEY) or {'values': Counter(), 'last_runs': {}}
+    samples = {}
+    for (name, labels), value in state['values'].items():
+        samples.setdefault(family_of(name), []).append((name, labels, value))
+    for kind, run in state['last_runs'].items():
+        labels = (('kind', kind),)
+        samples.setdefault('nh_ingest_last_run_timestamp_seconds', []).append(
+            ('nh_ingest_last_run_timestamp_seconds', labels, run['finished_at']))
+        samples.setdefault('nh_ingest_last_run_duration_seconds', []).append(
+            ('nh_ingest_last_run_duration_seconds', labels, run['duration']))
+
+    lines = []
+    for family, (metric_type, help_text) in METRIC_FAMILIES.items():
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {metric_type}')
+        for name, labels, value in sorted(samples.get(family, []),
+                                          key=sample_order):
+            lines.append(format_sample(name, labels, value))
+    return '\n'.join(lines) + '\n'
+
+
+def sample_order(sample):
+    name, labels, _ = sample
+    # Histogram buckets sort by bound, with +Inf last.
+    return name, [(key, float(value) if key == 'le' else value)
+                  for key, value in labels]
+
+
+ingest_metrics = IngestMetrics()
@@ -1,5 +1,8 @@
 from app.extensions import db, login
 from flask_login import UserMixin
+from sqlalchemy import func
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred, load_only
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
@@ -21,8 +24,15 @@ class User(UserMixin, db.Model):
 
 
 class Bill(db.Model):
+    __table_args__ = (
+        db.Index('ix_bill_last_updated_id', 'last_updated', 'id'),
+        # Bill numbers restart every session.
+        db.Index('uq_bill_session_year_number', 'session_year', 'number',
+                 unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    number = db.Column(db.String(20), index=True, unique=True)
+    number = db.Column(db.String(20), index=True)
     session_year = db.Column(db.String(4))
     title = db.Column(db.Text)
     summary = db.Column(db.Text)
@@ -31,16 +41,43 @@ class Bill(db.Model):
     general_status = db.Column(db.String(200))
     house_status = db.Column(db.String(200))
     senate_status = db.Column(db.String(200))
-    full_text = db.Column(db.Text)
+    # Large columns are only loaded when accessed or explicitly undeferred.
+    full_text = deferred(db.Column(db.Text))
     html_link = db.Column(db.String(300))
     category = db.Column(db.String(50), index=True)
+    category_scores = deferred(db.Column(db.JSON))
     docket_link = db.Column(db.String(300))
+    fingerprint = db.Column(db.String(40))
 
     next_hearing = db.relationship(
         'Hearing', uselist=False, back_populates='bill')
     docket_entries = db.relationship(
         'DocketEntry', back_populates='bill', order_by='desc(DocketEntry.date)')
 
+    @hybrid_property
+    def status(self):
+        return f"House: {self.house_status or ''}, Senate: {self.senate_status or ''}"
+
+    @status.expression
+    def status(cls):
+        return 'House: ' + func.coalesce(cls.house_status, '') + \
+            ', Senate: ' + func.coalesce(cls.senate_status, '')
+
+    @classmethod
+    def card_query(cls):
+        # Only the fields rendered on bill cards in list views.
+        return cls.query.options(load_only(
+            cls.number, cls.session_year, cls.summary, cls.category,
+            cls.house_status, cls.senate_status, cls.last_updated))
+
+    @classmethod
+    def by_number(cls, number, session_year=None, query=None):
+        # Without a session, the most recent bill with that number.
+        query = (cls.query if query is None else query).filter(cls.number == number)
+        if session_year:
+            return query.filter(cls.session_year == session_year)
+        return query.order_by(cls.session_year.desc())
+
     def __repr__(self):
         return f'<Bill {self.number}>'
 
@@ -66,6 +103,22 @@ class DocketEntry(db.Model):
     bill = db.relationship('Bill', back_populates='docket_entries')
 
 
+class BackfillCheckpoint(db.Model):
+    # One row per session; bills themselves are checkpointed by their
+    # committed fingerprint.
+    id = db.Column(db.Integer, primary_key=True)
+    session_year = db.Column(db.String(4), unique=True)
+    status = db.Column(db.String(20), default='pending')
+    total = db.Column(db.Integer, default=0)
+    completed = db.Column(db.Integer, default=0)
+    failed = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow,
+                           onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<BackfillCheckpoint {self.session_year} {self.status}>'
+
+
 # Association table for User-Bill many-to-many relationship
 user_bills = db.Table('user_bills',
                       db.Column('user_id', db.Integer, db.ForeignKey(
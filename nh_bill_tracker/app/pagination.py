@@ -0,0 +1,112 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from app.models import Bill
+
+
+class SortKey:
+    def __init__(self, expression, getter):
+        self.expression = expression
+        self.getter = getter
+
+
+# Newest first; matches the composite (last_updated, id) index. Getters work
+# on Bill instances and on column rows alike.
+BILL_RECENCY_KEYS = [SortKey(Bill.last_updated, lambda row: row.last_updated),
+                     SortKey(Bill.id, lambda row: row.id)]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values, backward=False):
+    payload = {'k': [_encode_value(v) for v in values], 'b': backward}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None, False
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        return [_decode_value(v) for v in payload['k']], bool(payload['b'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None, False
+
+
+def _after(keys, values, descending):
+    # Expanded row-value comparison: (k1, k2) > (v1, v2) and so on.
+    clauses = []
+    for i, key in enumerate(keys):
+        equal = [keys[j].expression == values[j] for j in range(i)]
+        step = key.expression < values[i] if descending else key.expression > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def _order_by(keys, descending):
+    return [key.expression.desc() if descending else key.expression.asc()
+            for key in keys]
+
+
+def iter_keyset_rows(query, keys, chunk_size, descending=False):
+    """Yield every row of ``query`` in key order, one LIMIT query per chunk."""
+    values = None
+    while True:
+        chunk_query = query
+        if values is not None:
+            chunk_query = chunk_query.filter(_after(keys, values, descending))
+        rows = chunk_query.order_by(None).order_by(
+            *_order_by(keys, descending)).limit(chunk_size).all()
+        if not rows:
+            return
+        yield from rows
+        values = [key.getter(rows[-1]) for key in keys]
+
+
+class KeysetPage:
+    """One page of a keyset-paginated query with opaque prev/next cursors."""
+
+    def __init__(self, query, keys, cursor=None, per_page=20,
+                 descending=True, total=None):
+        values, backward = decode_cursor(cursor)
+        if values is not None and len(values) != len(keys):
+            values, backward = None, False
+        # Walking backwards flips both the comparison and the ordering.
+        scan_descending = descending != backward
+        if values is not None:
+            query = query.filter(_after(keys, values, scan_descending))
+        query = query.order_by(None).order_by(*_order_by(keys, scan_descending))
+
+        rows = query.limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backward:
+            rows.reverse()
+
+        self.rows = rows
+        self.items = rows
+        self.total = total
+        self.next_cursor = None
+        self.prev_cursor = None
+        if rows:
+            first = [key.getter(rows[0]) for key in keys]
+            last = [key.getter(rows[-1]) for key in keys]
+            if has_more or backward:
+                self.next_cursor = encode_cursor(last)
+            if (backward and has_more) or (not backward and values is not None):
+                self.prev_cursor = encode_cursor(first, backward=True)
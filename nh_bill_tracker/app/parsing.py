@@ -0,0 +1,190 @@
+import html
+import html.entities
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+from app.categorizer import categorizer
+
+# Targeted extractors for the bits of HTML the ingest needs. They avoid
+# building a full BeautifulSoup tree and are plain module-level functions so
+# they can run in a process pool.
+BILL_TEXT_RE = re.compile(
+    r'<pre\b[^>]*\bclass\s*=\s*["\']?[^"\'>]*\baaaCtype\b[^>]*>(.*?)</pre\s*>',
+    re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]*>')
+DOCKET_ROW_RE = re.compile(r'<tr\b[^>]*>(.*?)</tr\s*>', re.IGNORECASE | re.DOTALL)
+DOCKET_CELL_RE = re.compile(r'<td\b[^>]*>(.*?)</td\s*>', re.IGNORECASE | re.DOTALL)
+SPACE_RE = re.compile(r'\s+')
+HEARING_RE = re.compile(
+    r'\bHearing:\s*(?P<date>\d{1,2}/\d{1,2}/\d{4})'
+    r'(?:,?\s*(?P<time>\d{1,2}:\d{2}\s*[ap]\.?m\.?))?\s*,?\s*(?P<location>[^;]*)',
+    re.IGNORECASE)
+
+BILL_TEXT_UNAVAILABLE = "Full bill text not available"
+# The feed is hand-built XML that can carry HTML named entities (&nbsp;,
+# &mdash;), which XML leaves undefined; they're rewritten as character
+# references before parsing.
+NAMED_ENTITY_RE = re.compile(rb'&([A-Za-z][A-Za-z0-9]{1,31});')
+XML_ENTITIES = {b'amp', b'lt', b'gt', b'quot', b'apos'}
+MAX_ENTITY_LENGTH = 34
+
+
+def xml_entity(match):
+    name = match.group(1)
+    codepoint = html.entities.name2codepoint.get(name.decode('ascii'))
+    if name in XML_ENTITIES or codepoint is None:
+        return match.group(0)
+    return b'&#%d;' % codepoint
+
+
+def strip_tags(markup):
+    return html.unescape(TAG_RE.sub('', markup or ''))
+
+
+def parse_bill_text(body, encoding):
+    content = body.decode(encoding or 'utf-8', errors='replace')
+    match = BILL_TEXT_RE.search(content)
+    if match is None:
+        return BILL_TEXT_UNAVAILABLE
+    return strip_tags(match.group(1))
+
+
+def parse_and_classify(body, encoding):
+    """Parse a bill text page and categorize it in one worker call.
+
+    Returns ``(text, category, scores, parse_seconds, classify_seconds)``.
+    Classifying costs far more CPU than parsing, so both stay off the event
+    loop.
+    """
+    started = time.perf_counter()
+    text = parse_bill_text(body, encoding)
+    parsed = time.perf_counter()
+    category, scores = categorizer.classify(text)
+    return (text, category, scores, parsed - started,
+            time.perf_counter() - parsed)
+
+
+def classify_text(text):
+    return categorizer.classify(text)
+
+
+def parse_docket(body, encoding):
+    """Return the docket table as ``(date, chamber, action)`` tuples."""
+    content = body.decode(encoding or 'utf-8', errors='replace')
+    actions = []
+    for row in DOCKET_ROW_RE.finditer(content):
+        cells = [SPACE_RE.sub(' ', strip_tags(cell)).strip()
+                 for cell in DOCKET_CELL_RE.findall(row.group(1))]
+        if len(cells) < 3:
+            continue
+        try:
+            date = datetime.strptime(cells[0], '%m/%d/%Y').date()
+        except ValueError:
+            continue  # header row
+        actions.append((date, cells[1][:10], cells[2]))
+    return actions
+
+
+def parse_hearing(action):
+    """Return ``(date, time, location)`` for a hearing notice, else None."""
+    match = HEARING_RE.search(action)
+    if match is None:
+        return None
+    try:
+        date = datetime.strptime(match.group('date'), '%m/%d/%Y').date()
+    except ValueError:
+        return None
+    return date, match.group('time') or '', match.group('location').strip()
+
+
+class FeedEntry(dict):
+    """One RSS item, keyed by child element name.
+
+    ``title`` and ``link`` are also attributes, like feedparser entries.
+    """
+
+    @property
+    def title(self):
+        return self.get('title', '')
+
+    @property
+    def link(self):
+        return self.get('link', '')
+
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+class FeedItemParser:
+    """Incremental RSS reader: feed it bytes, get back the finished items.
+
+    Items are detached from the tree once read, so memory stays flat no
+    matter how long the feed is. Malformed XML raises ElementTree.ParseError.
+    """
+
+    def __init__(self):
+        self.parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        self.open_elements = []
+        self.pending = b''
+        self.ready = []
+
+    def feed(self, data):
+        data = self.pending + data
+        # Hold back an entity split across chunks until its ';' arrives.
+        cut = data.rfind(b'&')
+        if cut != -1 and b';' not in data[cut:] and \
+                len(data) - cut < MAX_ENTITY_LENGTH:
+            data, self.pending = data[:cut], data[cut:]
+        else:
+            self.pending = b''
+        self.parser.feed(NAMED_ENTITY_RE.sub(xml_entity, data))
+        return self.read_items()
+
+    def close(self):
+        self.parser.feed(NAMED_ENTITY_RE.sub(xml_entity, self.pending))
+        self.pending = b''
+        self.parser.close()
+        return self.read_items()
+
+    def read_items(self):
+        # Items stay in self.ready until returned, so after a ParseError the
+        # ones that parsed before it can still be read.
+        for event, element in self.parser.read_events():
+            if event == 'start':
+                self.open_elements.append(element)
+                continue
+            self.open_elements.pop()
+            if local_name(element.tag) != 'item':
+                continue
+            self.ready.append(FeedEntry(
+                (local_name(child.tag), (child.text or '').strip())
+                for child in element))
+            if self.open_elements:
+                self.open_elements[-1].remove(element)
+        items, self.ready = self.ready, []
+        return items
+
+
+def timed_call(func, *args):
+    """Run ``func(*args)`` in a worker and return ``(result, seconds)``.
+
+    Timing inside the worker leaves out the wait for a free one.
+    """
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def create_parse_executor(config):
+    workers = config['INGEST_PARSE_WORKERS']
+    if config['INGEST_PARSE_EXECUTOR'] == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    # Spawned rather than forked: the app process runs scheduler and
+    # event-loop threads that fork() would copy in an arbitrary state.
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Clock reads are loop-independent so one registry can serve every event
+# loop in the process; all state changes happen between awaits.
+
+
+def retry_after_seconds(value):
+    """Seconds to wait for a Retry-After header (delta or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt, base, cap):
+    # Full jitter spreads retries out instead of sending them in waves.
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class AdaptiveTokenBucket:
+    """Requests-per-second limit that follows how the host is coping.
+
+    Healthy, fast responses raise the rate, by one request per second per
+    success until the host first pushes back (slow start) and additively
+    after that; slow responses and throttling cut it multiplicatively, at
+    most once per second.
+    """
+
+    DECREASE_INTERVAL = 1.0
+
+    def __init__(self, rate, burst, min_rate, max_rate, latency_target):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.latency_target = latency_target
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self.slow_start = True
+        self.latency = None
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            wait = self.paused_until - now
+            if wait <= 0:
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        if now - self.decreased_at < self.DECREASE_INTERVAL:
+            return
+        self.decreased_at = now
+        self.slow_start = False
+        self.rate = max(self.min_rate, self.rate * factor)
+
+    def record_latency(self, seconds):
+        self.latency = seconds if self.latency is None \
+            else 0.8 * self.latency + 0.2 * seconds
+        if self.latency > self.latency_target:
+            self._decrease(0.9)
+        else:
+            step = 1 if self.slow_start else 1 / self.rate
+            self.rate = min(self.max_rate, self.rate + step)
+
+    def throttle(self, retry_after=None):
+        self._decrease(0.5)
+        self.tokens = 0.0
+        if retry_after:
+            self.paused_until = max(self.paused_until,
+                                    time.monotonic() + retry_after)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures; one probe decides when to resume."""
+
+    def __init__(self, threshold, reset_timeout, name=''):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self):
+        if self.state == 'closed':
+            return True
+        if self.state == 'open':
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = 'half_open'
+        if self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self):
+        if self.state != 'closed':
+            logging.info(f"Circuit for {self.name} closed; host is responding")
+        self.state = 'closed'
+        self.failures = 0
+        self.probing = False
+
+    def release(self):
+        # A probe that ended without an outcome lets the next request probe.
+        self.probing = False
+
+    def record_failure(self):
+        # Requests already in flight when the circuit opened can still fail;
+        # only a failure while closed or half open moves the state.
+        if self.state == 'open':
+            return
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.threshold:
+            logging.warning(
+                f"Circuit for {self.name} opened after {self.failures} failures; "
+                f"failing fast for {self.reset_timeout}s")
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+
+class HostPolicy:
+    def __init__(self, name, settings):
+        self.bucket = AdaptiveTokenBucket(
+            settings['INGEST_RATE_LIMIT'], settings['INGEST_RATE_BURST'],
+            settings['INGEST_RATE_LIMIT_MIN'], settings['INGEST_RATE_LIMIT_MAX'],
+            settings['INGEST_LATENCY_TARGET'])
+        self.breaker = CircuitBreaker(settings['INGEST_BREAKER_THRESHOLD'],
+                                      settings['INGEST_BREAKER_RESET'], name)
+        self.backoff_base = settings['INGEST_RETRY_BACKOFF_BASE']
+        self.backoff_max = settings['INGEST_RETRY_BACKOFF_MAX']
+
+
+class HostPolicies:
+    """Per-host limiter and breaker, shared by every fetch in the process."""
+
+    DEFAULTS = {
+        'INGEST_RATE_LIMIT': 50.0,
+        'INGEST_RATE_BURST': 20,
+        'INGEST_RATE_LIMIT_MIN': 1.0,
+        'INGEST_RATE_LIMIT_MAX': 200.0,
+        'INGEST_LATENCY_TARGET': 2.0,
+        'INGEST_BREAKER_THRESHOLD': 5,
+        'INGEST_BREAKER_RESET': 30.0,
+        'INGEST_RETRY_BACKOFF_BASE': 1.0,
+        'INGEST_RETRY_BACKOFF_MAX': 30.0,
+    }
+
+    def __init__(self):
+        self.settings = dict(self.DEFAULTS)
+        self.hosts = {}
+
+    def configure(self, config):
+        settings = {key: config.get(key, default)
+                    for key, default in self.DEFAULTS.items()}
+        # Learned rates survive between runs unless the settings change.
+        if settings != self.settings:
+            self.settings = settings
+            self.hosts = {}
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc
+        policy = self.hosts.get(host)
+        if policy is None:
+            policy = self.hosts[host] = HostPolicy(host, self.settings)
+        return policy
+
+
+host_policies = HostPolicies()
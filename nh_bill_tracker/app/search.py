@@ -0,0 +1,72 @@
+from markupsafe import Markup, escape
+from sqlalchemy import column, func, literal_column, table, text
+from app.extensions import db
+from app.models import Bill
+
+# External-content FTS5 index over the searchable Bill columns. Triggers on
+# the bill table keep it in step with every insert, upsert and delete.
+SEARCH_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS bill_fts USING fts5("
+    "number, title, summary, full_text, content='bill', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS bill_fts_ai AFTER INSERT ON bill BEGIN "
+    "INSERT INTO bill_fts(rowid, number, title, summary, full_text) "
+    "VALUES (new.id, new.number, new.title, new.summary, new.full_text); END",
+    "CREATE TRIGGER IF NOT EXISTS bill_fts_ad AFTER DELETE ON bill BEGIN "
+    "INSERT INTO bill_fts(bill_fts, rowid, number, title, summary, full_text) "
+    "VALUES ('delete', old.id, old.number, old.title, old.summary, old.full_text); END",
+    "CREATE TRIGGER IF NOT EXISTS bill_fts_au "
+    "AFTER UPDATE OF number, title, summary, full_text ON bill BEGIN "
+    "INSERT INTO bill_fts(bill_fts, rowid, number, title, summary, full_text) "
+    "VALUES ('delete', old.id, old.number, old.title, old.summary, old.full_text); "
+    "INSERT INTO bill_fts(rowid, number, title, summary, full_text) "
+    "VALUES (new.id, new.number, new.title, new.summary, new.full_text); END",
+]
+
+bill_fts = table('bill_fts', column('rowid'))
+fts_table = literal_column('bill_fts')
+bm25_rank = func.bm25(fts_table)
+
+# Control characters can't occur in bill text, so they are safe to use as
+# highlight markers until the snippet has been HTML-escaped.
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+
+def has_search_index():
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    return db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bill_fts'"
+    )).first() is not None
+
+
+def rebuild_search_index():
+    for statement in SEARCH_INDEX_DDL:
+        db.session.execute(text(statement))
+    db.session.execute(text("INSERT INTO bill_fts(bill_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def fts_match_expression(query):
+    # Quote every term so user input can't inject FTS5 query syntax.
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    return ' '.join(terms)
+
+
+def search_bills_query(bill_query, query):
+    """Restrict ``bill_query`` to FTS matches for ``query``.
+
+    Returns a query yielding ``(Bill, snippet, rank)`` rows; lower BM25
+    ranks are better matches.
+    """
+    snippet = func.snippet(fts_table, -1, SNIPPET_START, SNIPPET_END,
+                           '…', 16)
+    return bill_query.join(bill_fts, bill_fts.c.rowid == Bill.id) \
+        .filter(fts_table.op('MATCH')(fts_match_expression(query))) \
+        .add_columns(snippet, bm25_rank)
+
+
+def highlight_snippet(snippet):
+    return Markup(str(escape(snippet or ''))
+                  .replace(SNIPPET_START, '<mark>')
+                  .replace(SNIPPET_END, '</mark>'))
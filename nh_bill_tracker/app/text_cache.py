@@ -0,0 +1,81 @@
+import hashlib
+import sqlite3
+import time
+from collections import namedtuple
+
+CachedText = namedtuple(
+    'CachedText', ['etag', 'last_modified', 'content_hash', 'text'])
+
+
+def content_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+class BillTextCache:
+    """On-disk LRU cache of parsed bill texts keyed by ``html_link``.
+
+    Entries keep the validators needed for conditional GETs (ETag,
+    Last-Modified) and a hash of the raw page so an unchanged body can be
+    recognised without parsing it again.
+    """
+
+    EVICT_BATCH = 100
+
+    def __init__(self, path, max_bytes):
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS bill_text ('
+            'url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+            'content_hash TEXT, text TEXT, size INTEGER, last_access REAL)')
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS ix_bill_text_last_access '
+            'ON bill_text (last_access)')
+        self.total_bytes = self.conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM bill_text').fetchone()[0]
+
+    def get(self, url):
+        row = self.conn.execute(
+            'SELECT etag, last_modified, content_hash, text FROM bill_text '
+            'WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute(
+            'UPDATE bill_text SET last_access = ? WHERE url = ?',
+            (time.time(), url))
+        return CachedText(*row)
+
+    def put(self, url, etag, last_modified, body_hash, text):
+        size = len(text.encode('utf-8'))
+        row = self.conn.execute(
+            'SELECT size FROM bill_text WHERE url = ?', (url,)).fetchone()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO bill_text '
+            '(url, etag, last_modified, content_hash, text, size, last_access) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (url, etag, last_modified, body_hash, text, size, time.time()))
+        self.total_bytes += size - (row[0] if row else 0)
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                'SELECT url, size FROM bill_text ORDER BY last_access LIMIT ?',
+                (self.EVICT_BATCH,)).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM bill_text WHERE url = ?', (url,))
+                self.total_bytes -= size
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def open_text_cache(config):
+    return BillTextCache(config['BILL_TEXT_CACHE_PATH'],
+                         config['BILL_TEXT_CACHE_MAX_BYTES'])
@@ -0,0 +1,165 @@
+"""Ingest throughput benchmark against the offline fixture server.
+
+From the nh_bill_tracker directory:
+
+    python -m benchmarks.bench_ingest --sizes 1000 5000 20000 --latency-ms 50
+
+Each size runs ``update_bills`` in a fresh subprocess with its own SQLite
+database and text cache, so peak RSS is measured per size. The first run
+is cold; later runs (``--runs``) exercise the unchanged-bill path.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixture_server import (FixtureSettings, fixture_urls,
+                                       start_fixture_server)
+
+
+class RetryCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.retries = 0
+
+    def emit(self, record):
+        if record.getMessage().startswith('Attempt '):
+            self.retries += 1
+
+
+class DBWriteTimer:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.seconds = 0.0
+        event.listen(engine, 'before_cursor_execute', self.before)
+        event.listen(engine, 'after_cursor_execute', self.after)
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['bench_query_start'] = time.perf_counter()
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:6].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+            self.seconds += time.perf_counter() - conn.info['bench_query_start']
+
+
+def peak_rss_mb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(own / 1024, 1), round(children / 1024, 1)
+
+
+def run_worker(args):
+    from config import Config
+    from app import create_app
+    from app.bill_tracker import update_bills
+    from app.extensions import db
+
+    workdir = tempfile.mkdtemp(prefix='nh-bench-')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+        BILL_TEXT_CACHE_PATH = os.path.join(workdir, 'bill_text_cache.db')
+        # Keep synthetic runs out of the deployment's cache and /metrics.
+        CACHE_DIR = os.path.join(workdir, 'cache')
+        INGEST_LOCK_DIR = os.path.join(workdir, 'locks')
+        RSS_FEED_URL = args.feed_url
+        BILL_TEXT_BASE_URL = args.text_url
+        BILL_DOCKET_BASE_URL = args.docket_url
+
+    retry_counter = RetryCounter()
+    logging.getLogger().addHandler(retry_counter)
+    app = create_app(BenchConfig)
+    results = []
+    try:
+        with app.app_context():
+            db.create_all()
+            db_timer = DBWriteTimer(db.engine)
+            for run in range(args.runs):
+                db_timer.seconds = 0.0
+                retry_counter.retries = 0
+                start = time.perf_counter()
+                new, changed, unchanged = update_bills()
+                elapsed = time.perf_counter() - start
+                processed = new + changed + unchanged
+                results.append({
+                    'run': run + 1,
+                    'new': new,
+                    'changed': changed,
+                    'unchanged': unchanged,
+                    'seconds': round(elapsed, 3),
+                    'bills_per_sec': round(processed / elapsed, 1) if elapsed else None,
+                    'db_write_seconds': round(db_timer.seconds, 3),
+                    'retries': retry_counter.retries,
+                    'peak_rss_mb': peak_rss_mb()[0],
+                    'peak_child_rss_mb': peak_rss_mb()[1],
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(results))
+
+
+def run_size(size, args):
+    settings = FixtureSettings(entries=size, latency_ms=args.latency_ms,
+                               jitter_ms=args.jitter_ms,
+                               error_rate=args.error_rate,
+                               body_size=args.body_size)
+    base_url, stop = start_fixture_server(settings)
+    feed_url, text_url, docket_url = fixture_urls(base_url)
+    try:
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_ingest', '--worker',
+             '--feed-url', feed_url, '--text-url', text_url,
+             '--docket-url', docket_url,
+             '--runs', str(args.runs)],
+            capture_output=True, text=True, check=True)
+    finally:
+        stop()
+    results = json.loads(completed.stdout.strip().splitlines()[-1])
+    for result in results:
+        result['entries'] = size
+        result['server_requests'] = settings.requests
+        result['server_errors'] = settings.errors
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--runs', type=int, default=2)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--jitter-ms', type=float, default=10)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    parser.add_argument('--body-size', type=int, default=8192)
+    parser.add_argument('--json', action='store_true',
+                        help='Print raw JSON results instead of a table.')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--feed-url', help=argparse.SUPPRESS)
+    parser.add_argument('--text-url', help=argparse.SUPPRESS)
+    parser.add_argument('--docket-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = [result for size in args.sizes for result in run_size(size, args)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = ['entries', 'run', 'seconds', 'bills_per_sec', 'db_write_seconds',
+               'retries', 'peak_rss_mb', 'peak_child_rss_mb', 'new', 'changed',
+               'unchanged']
+    print('  '.join(f'{column:>17}' for column in columns))
+    for result in results:
+        print('  '.join(f'{str(result[column]):>17}' for column in columns))
+
+
+if __name__ == '__main__':
+    main()
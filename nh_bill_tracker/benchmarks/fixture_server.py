@@ -0,0 +1,193 @@
+"""Offline stand-in for the gencourt RSS feed and billText.aspx pages.
+
+Run standalone with ``python -m benchmarks.fixture_server --entries 5000``
+and point RSS_FEED_URL/BILL_TEXT_BASE_URL at it, or start it in-process
+with ``start_fixture_server`` as the benchmark harness does.
+"""
+import argparse
+import asyncio
+import random
+import threading
+from datetime import date, timedelta
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+SESSION_YEAR = '2024'
+COMMITTEES = ['Education', 'Finance', 'Judiciary', 'Ways and Means',
+              'Health and Human Services', 'Transportation']
+STATUSES = ['Introduced', 'Referred to Committee', 'Hearing Scheduled',
+            'Passed', 'Inexpedient to Legislate']
+WORDS = ['school', 'tax', 'highway', 'hospital', 'zoning', 'climate',
+         'police', 'budget', 'relative', 'to', 'the', 'state', 'of',
+         'amend', 'section', 'chapter', 'municipal', 'shall']
+
+
+class FixtureSettings:
+    def __init__(self, entries=1000, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, body_size=8192, revision=0, seed=0):
+        self.entries = entries
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.body_size = body_size
+        # Bump to make every bill's RSS fields and text change.
+        self.revision = revision
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+
+def bill_text(bill_id, size, revision):
+    rng = random.Random(bill_id * 7919 + revision)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return f'AN ACT {bill_id}. ' + ' '.join(words)
+
+
+def docket_rows(bill_id, revision):
+    # One action per revision, so a new revision appends to the docket.
+    start = date(2024, 1, 3)
+    rows = [(start, 'H', f'Introduced {start:%m/%d/%Y} and referred to '
+                         f'{COMMITTEES[bill_id % len(COMMITTEES)]}')]
+    for step in range(1, revision + 1):
+        rows.append((start + timedelta(days=7 * step), 'H',
+                     f'Committee action {step} on bill {bill_id}'))
+    hearing = date.today() + timedelta(days=bill_id % 30 + 1)
+    rows.append((start, 'H', f'Public Hearing: {hearing:%m/%d/%Y} 10:00 am '
+                             f'LOB {200 + bill_id % 10}'))
+    return rows
+
+
+def rss_feed(settings, session_year=SESSION_YEAR):
+    items = []
+    for bill_id in range(1, settings.entries + 1):
+        rng = random.Random(bill_id + settings.revision)
+        items.append(
+            '<item>'
+            f'<title>HB{bill_id}</title>'
+            '<link>https://www.gencourt.state.nh.us/bill_status/legacy/bs2016/'
+            f'bill_status.aspx?lsr={bill_id}&amp;sy={session_year}</link>'
+            f'<description>{escape(f"<p>Relative to bill {bill_id}, revision {settings.revision}.</p>")}</description>'
+            f'<sessionyear>{session_year}</sessionyear>'
+            f'<housestatus>{rng.choice(STATUSES)}</housestatus>'
+            f'<senatestatus>{rng.choice(STATUSES)}</senatestatus>'
+            f'<latestcommittee>{rng.choice(COMMITTEES)}</latestcommittee>'
+            '</item>')
+    return ('<?xml version="1.0" encoding="utf-8"?>'
+            '<rss version="2.0"><channel><title>NH Bills</title>'
+            + ''.join(items) + '</channel></rss>')
+
+
+async def simulate_latency(settings):
+    delay = settings.latency_ms + settings.random.uniform(0, settings.jitter_ms)
+    if delay:
+        await asyncio.sleep(delay / 1000)
+
+
+def create_fixture_app(settings):
+    async def feed(request):
+        session_year = request.query.get('txtsessionyear') or SESSION_YEAR
+        return web.Response(text=rss_feed(settings, session_year),
+                            content_type='application/rss+xml')
+
+    async def bill_text_page(request):
+        settings.requests += 1
+        await simulate_latency(settings)
+        if settings.random.random() < settings.error_rate:
+            settings.errors += 1
+            return web.Response(status=503)
+
+        bill_id = int(request.query.get('id', 0))
+        etag = f'"{bill_id}-{settings.revision}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        text = escape(bill_text(bill_id, settings.body_size, settings.revision))
+        return web.Response(
+            text=f'<html><body><pre class="aaaCtype">{text}</pre></body></html>',
+            content_type='text/html', headers={'ETag': etag})
+
+    async def docket_page(request):
+        settings.requests += 1
+        await simulate_latency(settings)
+        bill_id = int(request.query.get('lsr', 0))
+        rows = ''.join(
+            f'<tr><td>{day:%m/%d/%Y}</td><td>{chamber}</td><td>{escape(action)}</td></tr>'
+            for day, chamber, action in docket_rows(bill_id, settings.revision))
+        return web.Response(
+            text='<html><body><table><tr><th>Date</th><th>Body</th>'
+                 f'<th>Description</th></tr>{rows}</table></body></html>',
+            content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/rssFeeds/rssQueryResults.aspx', feed)
+    app.router.add_get('/bill_status/legacy/bs2016/billText.aspx', bill_text_page)
+    app.router.add_get('/bill_status/legacy/bs2016/bill_docket.aspx', docket_page)
+    return app
+
+
+def start_fixture_server(settings, host='127.0.0.1', port=0):
+    """Serve the fixture in a daemon thread; returns ``(base_url, stop)``."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def start():
+        runner = web.AppRunner(create_fixture_app(settings))
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        state['runner'] = runner
+        state['port'] = runner.addresses[0][1]
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(
+            state['runner'].cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return f'http://{host}:{state["port"]}', stop
+
+
+def fixture_urls(base_url):
+    return (f'{base_url}/rssFeeds/rssQueryResults.aspx?txtsessionyear={SESSION_YEAR}',
+            f'{base_url}/bill_status/legacy/bs2016/billText.aspx',
+            f'{base_url}/bill_status/legacy/bs2016/bill_docket.aspx')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--entries', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--body-size', type=int, default=8192)
+    args = parser.parse_args()
+
+    settings = FixtureSettings(args.entries, args.latency_ms, args.jitter_ms,
+                               args.error_rate, args.body_size)
+    feed_url, text_url, docket_url = fixture_urls(f'http://{args.host}:{args.port}')
+    print(f'RSS_FEED_URL={feed_url}')
+    print(f'BILL_TEXT_BASE_URL={text_url}')
+    print(f'BILL_DOCKET_BASE_URL={docket_url}')
+    web.run_app(create_fixture_app(settings), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,53 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     BILLS_PER_PAGE = 10
+    # Totals are cached per data generation; disable to skip COUNT(*) entirely.
+    PAGINATION_COUNT_TOTALS = True
+    # Shared across workers; set CACHE_TYPE=RedisCache and CACHE_REDIS_URL
+    # to use Redis instead of the filesystem.
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'FileSystemCache'
+    CACHE_DIR = os.environ.get('CACHE_DIR') or os.path.join(basedir, 'cache')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_THRESHOLD = 5000
+    CACHE_DEFAULT_TIMEOUT = 24 * 3600
+    DOCKET_ENTRIES_PREVIEW = 3
+    DOCKET_ENTRIES_PER_PAGE = 50
+    API_MAX_PAGE_SIZE = 500
+    API_STREAM_CHUNK_SIZE = 1000
+    RSS_FEED_URL = os.environ.get('RSS_FEED_URL') or \
+        'https://www.gencourt.state.nh.us/rssFeeds/rssQueryResults.aspx?&txtsessionyear=2024&sortoption='
+    BILL_TEXT_BASE_URL = os.environ.get('BILL_TEXT_BASE_URL') or \
+        'https://www.gencourt.state.nh.us/bill_status/legacy/bs2016/billText.aspx'
+    BILL_DOCKET_BASE_URL = os.environ.get('BILL_DOCKET_BASE_URL') or \
+        'https://www.gencourt.state.nh.us/bill_status/legacy/bs2016/bill_docket.aspx'
+    # Enable in exactly one process (e.g. a dedicated worker) per deployment.
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '').lower() in ('1', 'true', 'yes')
+    INGEST_LOCK_DIR = os.environ.get('INGEST_LOCK_DIR') or \
+        os.path.join(basedir, 'locks')
+    INGEST_MAX_CONCURRENCY = int(os.environ.get('INGEST_MAX_CONCURRENCY') or 20)
+    INGEST_MAX_CONNECTIONS = int(os.environ.get('INGEST_MAX_CONNECTIONS') or 20)
+    INGEST_PER_HOST_LIMIT = int(os.environ.get('INGEST_PER_HOST_LIMIT') or 10)
+    INGEST_DNS_CACHE_TTL = 300
+    INGEST_KEEPALIVE_TIMEOUT = 30
+    # Per-host adaptive rate limit (requests/second) and circuit breaker.
+    INGEST_RATE_LIMIT = float(os.environ.get('INGEST_RATE_LIMIT') or 50)
+    INGEST_RATE_BURST = 20
+    INGEST_RATE_LIMIT_MIN = 1.0
+    INGEST_RATE_LIMIT_MAX = float(os.environ.get('INGEST_RATE_LIMIT_MAX') or 200)
+    INGEST_LATENCY_TARGET = 2.0
+    INGEST_BREAKER_THRESHOLD = 5
+    INGEST_BREAKER_RESET = 30.0
+    INGEST_RETRY_BACKOFF_BASE = 1.0
+    INGEST_RETRY_BACKOFF_MAX = 30.0
+    INGEST_WRITE_BATCH_SIZE = 500
+    INGEST_PARSE_EXECUTOR = os.environ.get('INGEST_PARSE_EXECUTOR') or 'process'
+    INGEST_PARSE_WORKERS = int(os.environ.get('INGEST_PARSE_WORKERS') or
+                               os.cpu_count() or 1)
+    BACKFILL_PARALLEL_SESSIONS = int(os.environ.get('BACKFILL_PARALLEL_SESSIONS') or 3)
+    RECATEGORIZE_CHUNK_SIZE = 500
+    BILL_TEXT_CACHE_PATH = os.environ.get('BILL_TEXT_CACHE_PATH') or \
+        os.path.join(basedir, 'bill_text_cache.db')
+    BILL_TEXT_CACHE_MAX_BYTES = 256 * 1024 * 1024
     WTF_CSRF_ENABLED = True
     # You should set this to a random value
     WTF_CSRF_SECRET_KEY = 'a-very-secret-key'
@@ -0,0 +1,48 @@
+"""Add bill full-text search index
+
+Revision ID: b61e0d94c3f2
+Revises: 8d3f1c2a9b47
+Create Date: 2026-10-18 11:40:07.218634
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b61e0d94c3f2'
+down_revision = '8d3f1c2a9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE bill_fts USING fts5("
+        "number, title, summary, full_text, content='bill', content_rowid='id')")
+    op.execute(
+        "CREATE TRIGGER bill_fts_ai AFTER INSERT ON bill BEGIN "
+        "INSERT INTO bill_fts(rowid, number, title, summary, full_text) "
+        "VALUES (new.id, new.number, new.title, new.summary, new.full_text); END")
+    op.execute(
+        "CREATE TRIGGER bill_fts_ad AFTER DELETE ON bill BEGIN "
+        "INSERT INTO bill_fts(bill_fts, rowid, number, title, summary, full_text) "
+        "VALUES ('delete', old.id, old.number, old.title, old.summary, old.full_text); END")
+    op.execute(
+        "CREATE TRIGGER bill_fts_au "
+        "AFTER UPDATE OF number, title, summary, full_text ON bill BEGIN "
+        "INSERT INTO bill_fts(bill_fts, rowid, number, title, summary, full_text) "
+        "VALUES ('delete', old.id, old.number, old.title, old.summary, old.full_text); "
+        "INSERT INTO bill_fts(rowid, number, title, summary, full_text) "
+        "VALUES (new.id, new.number, new.title, new.summary, new.full_text); END")
+    op.execute("INSERT INTO bill_fts(bill_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS bill_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS bill_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS bill_fts_ai")
+    op.execute("DROP TABLE IF EXISTS bill_fts")